@@ -3,6 +3,7 @@ from src.data_processor import DataProcessor
 from src.document_manager import EnhancedFileDocumentManager
 import json
 import os
+from collections.abc import Mapping
 
 def setup_railadvice_ai():
     """Setup AI with complete RailAdvice knowledge using document_manager"""
@@ -24,9 +25,10 @@ def setup_railadvice_ai():
     # Add company profile to document manager
     company_profile = all_data['company_profile']
     for section_name, section_data in company_profile.items():
-        if isinstance(section_data, dict):
+        if isinstance(section_data, Mapping):
             text_content = f"RailAdvice {section_name}:\n"
-            text_content += json.dumps(section_data, indent=2, ensure_ascii=False)
+            # Sections are read-only views; default=dict serializes the nested mappings
+            text_content += json.dumps(section_data, indent=2, ensure_ascii=False, default=dict)
         else:
             text_content = f"RailAdvice {section_name}: {section_data}"
         
@@ -128,7 +130,7 @@ Budsjett/Verdi: {project.get('estimated_value', project.get('budget', 'Konfidens
 
 Resultater: {project.get('outcome', 'Pågående')}
 
-Nøkkeldata: {json.dumps(project.get('key_metrics', {}), ensure_ascii=False)}"""
+Nøkkeldata: {json.dumps(project.get('key_metrics', {}), ensure_ascii=False, default=dict)}"""
         
         # Clean up tags - ensure all are strings
         project_tags = ["projekt", project['client'], project['type']]
@@ -1,7 +1,8 @@
 import os
 import asyncio
-import json
 import re
+import threading
+import orjson
 from datetime import datetime
 from pathlib import Path
 from collections import Counter
@@ -20,6 +21,42 @@ _chroma_client = None
 _loading_lock = asyncio.Lock() if 'asyncio' in globals() else None
 
 
+def _compile_any(patterns, flags=0):
+    """Compile alternative patterns into a single regex"""
+    return re.compile("|".join(f"(?:{p})" for p in patterns), flags)
+
+
+# Enhanced patterns for better recognition, compiled once at import
+_GREETING_RE = _compile_any([
+    r'\b(hei|hi|hallo|god\s*morgen|god\s*dag|god\s*kveld)\b',
+    r'^(hey|hello|yo|halla)$',
+    r'(hva\s*skjer|hvordan\s*har\s*du\s*det|hvordan\s*går\s*det)',
+])
+
+_IDENTITY_RE = _compile_any([
+    r'\b(hvem\s*er\s*du|who\s*are\s*you|hva\s*er\s*du|what\s*are\s*you)\b',
+    r'\b(kan\s*du\s*presentere\s*deg|introduce\s*yourself)\b',
+    r'\b(fortell\s*om\s*deg\s*selv|tell\s*me\s*about\s*yourself)\b'
+])
+
+_HELP_RE = _compile_any([
+    r'\b(hjelp|help|hva\s*kan\s*du|what\s*can\s*you)\b',
+    r'\b(kommandoer|commands|funksjonalitet|functionality)\b'
+])
+
+_FAREWELL_RE = _compile_any([
+    r"\b(hade|ha det|bye|farvel|snakkes|vi ses)\b",
+    r"(takk for hjelpen|takk skal du ha)"
+])
+
+# Content cleanup patterns
+_SECTION_HEADER_RE = re.compile(r'^(PROSJEKT|TEKNISK KUNNSKAP|KOMPETANSE|MARKEDSINNSATS|INNHOLD):.*?\s*', re.IGNORECASE | re.DOTALL)
+_METADATA_FIELD_RE = re.compile(r'(Kunde|Type|Status|År|Kode|Kategori|Tittel):\s*[^ \n]+', re.IGNORECASE)
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+_DOC_ID_RE = re.compile(r'\(ID: [0-9a-f-]+\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
 def fix_metadata(metadata):
     """Convert list values to strings for ChromaDB compatibility"""
     if not metadata:
@@ -87,36 +124,55 @@ class LazyLoader:
         return _chroma_client
 
 
+def _shared_attr(name):
+    """Property that reads/writes an entry of RailAdviceAI's shared state"""
+    return property(
+        lambda self: self._get_shared_state()[name],
+        lambda self, value: self._get_shared_state().__setitem__(name, value),
+    )
+
+
 class RailAdviceAI:
+    # Documents, embeddings and ML handles are shared by every instance in the
+    # process, so extra (e.g. per-user contextual) sessions don't re-embed the corpus
+    _shared = None
+    _shared_lock = threading.RLock()
+
+    documents_text = _shared_attr("documents_text")
+    documents_metadata = _shared_attr("documents_metadata")
+    collection = _shared_attr("collection")
+    tfidf = _shared_attr("tfidf")
+    embedder = _shared_attr("embedder")
+    nlp = _shared_attr("nlp")
+    client = _shared_attr("client")
+    _initialized = _shared_attr("initialized")
+    _doc_manager = _shared_attr("doc_manager")
+
+    @classmethod
+    def _get_shared_state(cls):
+        """Get (lazily creating) the state shared across all AI instances"""
+        if RailAdviceAI._shared is None:
+            with RailAdviceAI._shared_lock:
+                if RailAdviceAI._shared is None:
+                    RailAdviceAI._shared = {
+                        "documents_text": [],
+                        "documents_metadata": [],
+                        "collection": None,
+                        "tfidf": None,
+                        "embedder": None,
+                        "nlp": None,
+                        "client": None,
+                        "initialized": False,
+                        "doc_manager": None,
+                    }
+        return RailAdviceAI._shared
+
     def __init__(self, lazy_init=True):
         print("🚀 Initializing RailAdvice AI...")
         
         # Initialize light components immediately
         self.lazy_init = lazy_init
-        self.documents_text = []
-        self.documents_metadata = []
-        self.collection = None
-        self.tfidf = None
-        self._initialized = False
-        self._doc_manager = None
-        
-        # Enhanced patterns for better recognition
-        self.greeting_patterns = [
-            r'\b(hei|hi|hallo|god\s*morgen|god\s*dag|god\s*kveld)\b',
-            r'^(hey|hello|yo|halla)$',
-            r'(hva\s*skjer|hvordan\s*har\s*du\s*det|hvordan\s*går\s*det)',
-        ]
-        
-        self.identity_patterns = [
-            r'\b(hvem\s*er\s*du|who\s*are\s*you|hva\s*er\s*du|what\s*are\s*you)\b',
-            r'\b(kan\s*du\s*presentere\s*deg|introduce\s*yourself)\b',
-            r'\b(fortell\s*om\s*deg\s*selv|tell\s*me\s*about\s*yourself)\b'
-        ]
-        
-        self.help_patterns = [
-            r'\b(hjelp|help|hva\s*kan\s*du|what\s*can\s*you)\b',
-            r'\b(kommandoer|commands|funksjonalitet|functionality)\b'
-        ]
+        self._get_shared_state()
         
         # Enhanced keyword patterns for better matching
         self.keyword_patterns = {
@@ -139,6 +195,11 @@ class RailAdviceAI:
         if self._initialized:
             return
         
+        with RailAdviceAI._shared_lock:
+            if not self._initialized:
+                self._initialize_heavy_components()
+
+    def _initialize_heavy_components(self):
         try:
             print("🔄 Loading ML components...")
             
@@ -161,8 +222,8 @@ class RailAdviceAI:
             
             # Initialize document manager
             try:
-                from src.document_manager import EnhancedFileDocumentManager
-                self._doc_manager = EnhancedFileDocumentManager()
+                from src.document_manager import get_document_manager
+                self._doc_manager = get_document_manager()
                 print("✅ Document manager loaded")
             except Exception as e:
                 print(f"⚠️ Document manager failed to load: {e}")
@@ -175,12 +236,12 @@ class RailAdviceAI:
                 print(f"⚠️ TF-IDF not available: {e}")
                 self.tfidf = None
             
-            self._initialized = True
-            
-            # Load documents if document manager is available
-            if self._doc_manager:
-                self.load_knowledge_base()
+            # Load documents if document manager is available. Still under
+            # _shared_lock, so other instances wait for the full corpus
+            if self._doc_manager and not self.load_knowledge_base():
+                raise RuntimeError("knowledge base failed to load")
             
+            self._initialized = True
             print("✅ Heavy components loaded successfully")
             
         except Exception as e:
@@ -222,19 +283,16 @@ class RailAdviceAI:
             return "single_word"
         
         # Check for greetings
-        for pattern in self.greeting_patterns:
-            if re.search(pattern, text_lower):
-                return "greeting"
+        if _GREETING_RE.search(text_lower):
+            return "greeting"
         
         # Check for identity questions
-        for pattern in self.identity_patterns:
-            if re.search(pattern, text_lower):
-                return "identity"
+        if _IDENTITY_RE.search(text_lower):
+            return "identity"
         
         # Check for help requests
-        for pattern in self.help_patterns:
-            if re.search(pattern, text_lower):
-                return "help"
+        if _HELP_RE.search(text_lower):
+            return "help"
         
         # Check for questions vs statements
         if text.strip().endswith('?') or text_lower.startswith(('hva', 'hvem', 'hvor', 'når', 'hvorfor', 'hvordan', 'kan', 'vil', 'what', 'who', 'where', 'when', 'why', 'how', 'can', 'will')):
@@ -326,11 +384,11 @@ Prøv å spørre om noe - jeg lærer fra dokumentene dine!"""
             return []
         
         # Clean up metadata patterns
-        cleaned_text = re.sub(r'^(PROSJEKT|TEKNISK KUNNSKAP|KOMPETANSE|MARKEDSINNSATS|INNHOLD):.*?\s*', '', text, flags=re.IGNORECASE | re.DOTALL)
-        cleaned_text = re.sub(r'(Kunde|Type|Status|År|Kode|Kategori|Tittel):\s*[^ \n]+', '', cleaned_text, flags=re.IGNORECASE)
+        cleaned_text = _SECTION_HEADER_RE.sub('', text)
+        cleaned_text = _METADATA_FIELD_RE.sub('', cleaned_text)
         
         # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', cleaned_text)
+        sentences = _SENTENCE_SPLIT_RE.split(cleaned_text)
         
         good_sentences = []
         for sentence in sentences:
@@ -346,8 +404,8 @@ Prøv å spørre om noe - jeg lærer fra dokumentene dine!"""
                 continue
             
             # Clean up
-            sentence = re.sub(r'\(ID: [0-9a-f-]+\)', '', sentence)
-            sentence = re.sub(r'\s+', ' ', sentence).strip()
+            sentence = _DOC_ID_RE.sub('', sentence)
+            sentence = _WHITESPACE_RE.sub(' ', sentence).strip()
             
             if sentence:
                 good_sentences.append(sentence)
@@ -359,60 +417,77 @@ Prøv å spørre om noe - jeg lærer fra dokumentene dine!"""
 
     def generate_smart_response(self, question, docs, confidence, input_type):
         """Generate intelligent, natural responses based on input type"""
+        return "".join(self.iter_smart_response(question, docs, confidence, input_type))
+
+    def iter_smart_response(self, question, docs, confidence, input_type):
+        """generate_smart_response as chunks that join to the full answer
+
+        Document answers are yielded sentence by sentence as each document is
+        processed; every other answer is a single chunk.
+        """
         
         # Handle special input types first
         if input_type == "greeting":
             doc_count = len(self.documents_text)
             if doc_count == 0:
-                return "Hei! Jeg er RailAdvice AI. Jeg har ingen dokumenter å jobbe med ennå - legg til dokumenter så kan jeg hjelpe deg!"
-            return f"Hei! Jeg er RailAdvice AI med {doc_count} dokumenter tilgjengelig. Hva kan jeg hjelpe deg med?"
+                yield "Hei! Jeg er RailAdvice AI. Jeg har ingen dokumenter å jobbe med ennå - legg til dokumenter så kan jeg hjelpe deg!"
+                return
+            yield f"Hei! Jeg er RailAdvice AI med {doc_count} dokumenter tilgjengelig. Hva kan jeg hjelpe deg med?"
+            return
         
         elif input_type == "identity":
-            return self.get_identity_response()
+            yield self.get_identity_response()
+            return
         
         elif input_type == "help":
-            return self.get_help_response()
+            yield self.get_help_response()
+            return
         
         elif input_type.startswith("single_"):
-            return self.handle_single_word(question, input_type)
+            yield self.handle_single_word(question, input_type)
+            return
         
         # Handle cases with no relevant documents
         if not docs:
-            return self.generate_intelligent_fallback(question, input_type)
-        
-        # Process documents and generate response
-        response_parts = []
-        
-        # Extract meaningful content from documents
-        for doc in docs:
-            meaningful_sentences = self.extract_meaningful_content(doc, max_sentences=2)
-            response_parts.extend(meaningful_sentences)
-        
-        if not response_parts:
-            return "Jeg fant relevante dokumenter, men ikke klart innhold som svarer på spørsmålet ditt. Kan du være mer spesifikk?"
+            yield self.generate_intelligent_fallback(question, input_type)
+            return
         
         # Build natural response
         intro_phrases = ["Basert på min kunnskapsbase", "Dokumentasjon viser at", "Angående ditt spørsmål", "Jeg fant følgende informasjon"]
         intro = intro_phrases[np.random.randint(0, len(intro_phrases))] if len(intro_phrases) > 0 else "Basert på dokumentene"
         
         if confidence == "High":
-            main_content = " ".join(response_parts)
-            response = f"{intro}: {main_content}"
-            if len(response_parts) > 1:
-                response += " Ønsker du mer detaljert informasjon?"
+            prefix = intro
         elif confidence == "Medium":
-            main_content = " ".join(response_parts)
-            response = f"Basert på min kunnskapsbase: {main_content}."
+            prefix = "Basert på min kunnskapsbase"
         else:  # Low confidence
-            main_content = " ".join(response_parts[:1])
-            response = f"Jeg fant noe relevant informasjon: {main_content} Kan du omformulere spørsmålet?"
-        
-        # Clean up response
-        response = re.sub(r'\s+', ' ', response).strip()
-        if not response.endswith(('.', '!', '?')):
-            response += '.'
+            prefix = "Jeg fant noe relevant informasjon"
         
-        return response
+        # Extract meaningful content from documents. The intro goes out with
+        # the first sentence, once it's known there is something to say.
+        # Sentences come back whitespace-normalized, so the chunks need no cleanup
+        count = 0
+        sentence = ""
+        for doc in docs:
+            for sentence in self.extract_meaningful_content(doc, max_sentences=2):
+                count += 1
+                if count > 1:
+                    yield f" {sentence}"
+                    continue
+                yield f"{prefix}: {sentence}"
+                if confidence not in ("High", "Medium"):
+                    # Low confidence answers with the first sentence only
+                    yield " Kan du omformulere spørsmålet?"
+                    return
+        
+        if count == 0:
+            yield "Jeg fant relevante dokumenter, men ikke klart innhold som svarer på spørsmålet ditt. Kan du være mer spesifikk?"
+        elif confidence == "Medium":
+            yield "."
+        elif count > 1:
+            yield " Ønsker du mer detaljert informasjon?"
+        elif not sentence.endswith(('.', '!', '?')):
+            yield "."
 
     def generate_intelligent_fallback(self, question, input_type):
         """Generate intelligent responses when no documents match"""
@@ -439,17 +514,17 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
             return f"Jeg forstår spørsmålet ditt, men fant ikke svar i de {doc_count} dokumentene. Prøv å omformulere spørsmålet eller legg til mer relevant dokumentasjon."
 
     def load_knowledge_base(self):
-        """Load all documents from document manager"""
+        """Load all documents from document manager; returns False if loading failed"""
         if not self._doc_manager:
             print("⚠️ Document manager not available")
-            return
+            return False
         
         try:
             all_docs = self._doc_manager.load_all_documents()
             
             if not all_docs:
                 print("⚠️ No documents found")
-                return
+                return True
             
             print(f"📄 Loading {len(all_docs)} documents...")
             
@@ -473,16 +548,19 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
                         "added_date": doc.get("created_at", datetime.now().isoformat())
                     }
 
-                    self.add_document_to_ai(text=content, metadata=metadata)
+                    # Runs during initialization, before _initialized is set
+                    self._add_document_to_ai(text=content, metadata=metadata)
                     
                 except Exception as e:
                     print(f"⚠️ Error loading document {doc.get('title', 'Unknown')}: {e}")
                     continue
             
             print(f"✅ Loaded {len(self.documents_text)} documents into AI")
+            return True
             
         except Exception as e:
             print(f"❌ Failed to load knowledge base: {e}")
+            return False
 
     def reload_documents(self):
         """Reload all documents"""
@@ -508,6 +586,15 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
 
     def add_document_to_ai(self, text, metadata):
         """Add document to AI (internal method)"""
+        try:
+            self.ensure_initialized()
+        except Exception as e:
+            print(f"⚠️ Failed to add document to AI: {e}")
+            return
+        self._add_document_to_ai(text, metadata)
+
+    def _add_document_to_ai(self, text, metadata):
+        """Add document to AI without triggering initialization"""
         try:
             if not isinstance(text, str):
                 text = str(text)
@@ -515,8 +602,8 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
             if not text.strip():
                 return
             
-            # Only add to ChromaDB if initialized
-            if self.ensure_initialized() and self.collection:
+            # Only add to ChromaDB once the ML components are loaded
+            if self.collection and self.embedder:
                 embedding = self.embedder.encode([text])[0].tolist()
                 
                 # Add to local storage
@@ -664,6 +751,30 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
 
     def query(self, question):
         """Main query function with enhanced response generation"""
+        chunks = self.query_stream(question)
+        while True:
+            try:
+                next(chunks)
+            except StopIteration as stop:
+                return stop.value
+
+    @staticmethod
+    def _yield_answer(result):
+        """Yield a finished result's answer as one chunk and return the result"""
+        yield result["answer"]
+        return result
+
+    def query_stream(self, question):
+        """Generator variant of query() that yields the answer while it is built.
+
+        Answers that don't come from the documents are a single chunk. For
+        document answers the semantic search runs first (its confidence picks
+        the intro); the intro and first sentence are then yielded before the
+        remaining documents are processed. There is no token-level generator,
+        so the first chunk still waits for the search. Joining the chunks
+        gives the full answer; the complete query() result is the generator's
+        return value.
+        """
         print(f"❓ Processing: {question}")
         
         # Classify input type
@@ -679,7 +790,7 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
             else:  # help
                 response = self.get_help_response()
             
-            return {
+            return (yield from self._yield_answer({
                 "answer": response,
                 "sources": 0,
                 "confidence": input_type.title(),
@@ -687,12 +798,12 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
                 "intent_categories": [input_type],
                 "specific_terms": [],
                 "analysis": {}
-            }
+            }))
         
         # For other queries, try to initialize heavy components if needed
         if not self._initialized:
             if self.lazy_init:
-                return {
+                return (yield from self._yield_answer({
                     "answer": "AI engine is still loading. Please try again in a moment.",
                     "sources": 0,
                     "confidence": "Loading",
@@ -701,12 +812,12 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
                     "specific_terms": [],
                     "analysis": {},
                     "loading": True
-                }
+                }))
             else:
                 try:
                     self.initialize_heavy_components()
                 except Exception as e:
-                    return {
+                    return (yield from self._yield_answer({
                         "answer": f"AI engine initialization failed: {str(e)}. Please try again later.",
                         "sources": 0,
                         "confidence": "Error",
@@ -714,11 +825,11 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
                         "intent_categories": [],
                         "specific_terms": [],
                         "analysis": {}
-                    }
+                    }))
         
         # Check if we have documents
         if not self.documents_text and input_type not in ["single_word", "single_keyword"]:
-            return {
+            return (yield from self._yield_answer({
                 "answer": "Jeg har ingen dokumenter å svare basert på. Legg til dokumenter med document manager, så kan jeg hjelpe deg!",
                 "sources": 0,
                 "confidence": "No Documents",
@@ -726,18 +837,21 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
                 "intent_categories": [],
                 "specific_terms": [],
                 "analysis": {}
-            }
+            }))
         
+        chunks = []
         try:
             intent_analysis = self.extract_keywords_and_intent(question)
             print(f"🔍 Intent: Categories={intent_analysis['categories']}, Terms={intent_analysis['specific_terms']}")
             
             best_docs, confidence, analysis = self.find_best_response(question, intent_analysis)
             
-            response = self.generate_smart_response(question, best_docs, confidence, input_type)
+            for chunk in self.iter_smart_response(question, best_docs, confidence, input_type):
+                chunks.append(chunk)
+                yield chunk
             
             return {
-                "answer": response,
+                "answer": "".join(chunks),
                 "sources": len(best_docs),
                 "confidence": confidence,
                 "input_type": input_type,
@@ -747,8 +861,13 @@ Legg til dokumenter via document manager, så kan jeg hjelpe deg med jernbanerel
             }
         except Exception as e:
             print(f"⚠️ Error in query processing: {e}")
+            # Appended to whatever part of the answer was already streamed
+            error = "Beklager, det oppstod en feil under behandling av spørsmålet ditt. Prøv igjen med et annet spørsmål."
+            if chunks:
+                error = " " + error
+            yield error
             return {
-                "answer": f"Beklager, det oppstod en feil under behandling av spørsmålet ditt. Prøv igjen med et annet spørsmål.",
+                "answer": "".join(chunks) + error,
                 "sources": 0,
                 "confidence": "Error",
                 "input_type": input_type,
@@ -763,49 +882,57 @@ class ContextualRailAdviceAI(RailAdviceAI):
         super().__init__(lazy_init=lazy_init)
         self.memory_file = Path(memory_file)
         self.conversation_history = self.load_memory()
-        self.farewell_patterns = [
-            r"\b(hade|ha det|bye|farvel|snakkes|vi ses)\b",
-            r"(takk for hjelpen|takk skal du ha)"
-        ]
+        # Input types answered directly, without going through the base class
+        self._response_dispatch = {
+            "farewell": self.get_farewell_response,
+        }
 
     def load_memory(self):
-        if self.memory_file.exists():
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        try:
+            return orjson.loads(self.memory_file.read_bytes())
+        except FileNotFoundError:
+            return []
+        except orjson.JSONDecodeError as e:
+            print(f"⚠️ Corrupt memory file, starting fresh: {e}")
+            return []
 
     def save_memory(self):
         try:
-            with open(self.memory_file, "w", encoding="utf-8") as f:
-                json.dump(self.conversation_history, f, indent=2, ensure_ascii=False)
+            self.memory_file.write_bytes(
+                orjson.dumps(self.conversation_history, option=orjson.OPT_INDENT_2)
+            )
         except Exception as e:
             print(f"⚠️ Failed to save memory: {e}")
 
     def classify_input_type(self, text):
         text_lower = text.lower().strip()
-        for pattern in self.farewell_patterns:
-            if re.search(pattern, text_lower):
-                return "farewell"
+        if _FAREWELL_RE.search(text_lower):
+            return "farewell"
         return super().classify_input_type(text)
 
-    def generate_smart_response(self, question, docs, confidence, input_type):
-        if input_type == "farewell":
-            return "Takk for praten! Ta kontakt igjen når du trenger hjelp med jernbaneprosjekter."
-        return super().generate_smart_response(question, docs, confidence, input_type)
+    def get_farewell_response(self):
+        """Response for farewells"""
+        return "Takk for praten! Ta kontakt igjen når du trenger hjelp med jernbaneprosjekter."
 
-    def query(self, question):
-        result = super().query(question)
-        
-        # Save conversation history
-        self.conversation_history.append({"user": question, "ai": result["answer"]})
+    def iter_smart_response(self, question, docs, confidence, input_type):
+        handler = self._response_dispatch.get(input_type)
+        if handler:
+            yield handler()
+            return
+        yield from super().iter_smart_response(question, docs, confidence, input_type)
+
+    def query_stream(self, question):
+        # query() runs through here too, so both record the exchange
+        result = yield from super().query_stream(question)
+        self.remember(question, result["answer"])
+        return result
+
+    def remember(self, question, answer):
+        """Save an exchange to the conversation history"""
+        self.conversation_history.append({"user": question, "ai": answer})
         if len(self.conversation_history) > 20:
             self.conversation_history = self.conversation_history[-20:]
         self.save_memory()
-        
-        return result
 
 
 # Factory function for creating AI instances
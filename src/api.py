@@ -1,22 +1,39 @@
 import sys
 import os
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
+import time
+import functools
+import hashlib
 from pathlib import Path
-from contextlib import asynccontextmanager
-from typing import Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from typing import Callable, Hashable, Optional
+import orjson
+from fastapi import FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict, Field
 import uvicorn
 
-# Setup logging with better configuration
+# Setup logging with better configuration. Records are formatted and queued
+# on the calling thread; a listener thread does the actual stderr writes so
+# request handlers never block on the stream lock
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler()]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -25,19 +42,75 @@ class AppState:
     def __init__(self):
         self.doc_manager: Optional[object] = None
         self.ai_engine: Optional[object] = None
-        self.ai_loading = False
         self.ai_loaded = False
-        self.initialization_lock = asyncio.Lock()
+        # Single in-flight AI initialization shared by every caller
+        self.ai_init_task: Optional[asyncio.Task] = None
+        # Debounced AI reload after document uploads
+        self.reload_pending = False
+        self.reload_task: Optional[asyncio.Task] = None
+        # Identical chat questions: in-flight queries and recent results
+        self.chat_inflight: dict[str, asyncio.Future] = {}
+        self.chat_cache: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        # Bumped when the documents change; answers begun earlier aren't cached
+        self.chat_generation = 0
+        # Separate pools so slow AI work can't starve document I/O (or vice versa).
+        # Created per lifespan by start_executors; None falls back to the loop's default
+        self.ai_executor: Optional[ThreadPoolExecutor] = None
+        self.io_executor: Optional[ThreadPoolExecutor] = None
+        self.doc_count = 0
+        self.doc_count_cached_at = float("-inf")
+
+    def start_executors(self):
+        """Create fresh thread pools (each lifespan shuts its own down)"""
+        self.ai_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai")
+        self.io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="io")
+
+    def stop_executors(self):
+        executors, self.ai_executor, self.io_executor = (self.ai_executor, self.io_executor), None, None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def ai_loading(self) -> bool:
+        return self.ai_init_task is not None and not self.ai_init_task.done()
 
 app_state = AppState()
 
+# Seconds clients are told to wait (Retry-After) while the AI engine warms up
+AI_LOADING_RETRY_AFTER = 5
+
+# Wait this long after an upload so a burst of uploads triggers one AI reload
+RELOAD_DEBOUNCE_SECONDS = 2.0
+
+# Recent answers are reused for identical questions for this long
+CHAT_CACHE_TTL = 30.0
+CHAT_CACHE_SIZE = 256
+# Transient answers that must be recomputed rather than reused
+UNCACHEABLE_CONFIDENCE = frozenset({"Error", "Loading", "No Documents"})
+
+# Health probes fire every few seconds; don't recount documents on each one
+DOC_COUNT_TTL = 5.0
+
+# Static response bodies, serialized once
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "RailAdvice AI"})
+NOT_FOUND_BODY = orjson.dumps({
+    "error": "Endpoint not found",
+    "available_endpoints": ["/", "/docs", "/api/health", "/api/chat"]
+})
+INTERNAL_ERROR_BODY = orjson.dumps({"error": "Internal server error", "message": "Please try again later"})
+
+# Serialized status payloads keyed by the state they were built from
+_payload_cache: dict[str, tuple[Hashable, bytes]] = {}
+
 # Lazy imports to speed up startup
+@functools.cache
 def get_modules():
-    """Lazy import modules only when needed"""
+    """Lazy import modules only when needed (imported once, then memoized)"""
     try:
-        from src.document_manager import EnhancedFileDocumentManager
+        from src.document_manager import get_document_manager
         from src.ai_engine import RailAdviceAI, create_ai_engine
-        return EnhancedFileDocumentManager, RailAdviceAI, create_ai_engine
+        return get_document_manager, RailAdviceAI, create_ai_engine
     except ImportError as e:
         logger.error(f"Failed to import modules: {e}")
         raise
@@ -48,8 +121,8 @@ async def initialize_document_manager():
         return True
         
     try:
-        EnhancedFileDocumentManager, _, _ = get_modules()
-        app_state.doc_manager = EnhancedFileDocumentManager()
+        get_document_manager, _, _ = get_modules()
+        app_state.doc_manager = get_document_manager()
         app_state.doc_manager.load_external_documents()
         logger.info("✅ Document manager initialized")
         return True
@@ -58,52 +131,53 @@ async def initialize_document_manager():
         return False
 
 async def initialize_ai_engine():
-    """Initialize AI engine with proper async handling"""
-    async with app_state.initialization_lock:
-        if app_state.ai_loaded or app_state.ai_loading:
-            return app_state.ai_engine
-            
-        app_state.ai_loading = True
+    """Initialize AI engine (run via get_or_start_ai_init, not directly)"""
+    try:
+        logger.info("🧠 Initializing AI engine...")
+        _, _, create_ai_engine = get_modules()
         
-        try:
-            logger.info("🧠 Initializing AI engine...")
-            _, _, create_ai_engine = get_modules()
-            
-            # Run CPU-intensive initialization in thread pool
-            loop = asyncio.get_event_loop()
-            app_state.ai_engine = await loop.run_in_executor(
-                None, lambda: create_ai_engine(lazy=False, contextual=True)
-            )
-            
-            app_state.ai_loaded = True
-            doc_count = getattr(app_state.ai_engine, 'documents_count', 0)
-            logger.info(f"✅ AI engine initialized with {doc_count} documents")
-            
-        except Exception as e:
-            logger.error(f"❌ AI engine initialization failed: {e}")
-            app_state.ai_engine = None
-            
-        finally:
-            app_state.ai_loading = False
-            
-        return app_state.ai_engine
+        # Run CPU-intensive initialization in the AI thread pool. A process pool
+        # isn't an option: the engine holds a Chroma client (SQLite handles), a
+        # torch model and class-level shared state, none of which survive
+        # pickling back to this process. Pinning the thread's CPU affinity is
+        # avoided too, since torch's worker threads would inherit the pin.
+        loop = asyncio.get_running_loop()
+        app_state.ai_engine = await loop.run_in_executor(
+            app_state.ai_executor,
+            functools.partial(create_ai_engine, lazy=False, contextual=True),
+        )
+        
+        app_state.ai_loaded = True
+        doc_count = len(app_state.ai_engine.documents_text)
+        logger.info(f"✅ AI engine initialized with {doc_count} documents")
+        
+    except Exception as e:
+        logger.error(f"❌ AI engine initialization failed: {e}")
+        app_state.ai_engine = None
+        
+    return app_state.ai_engine
+
+def get_or_start_ai_init() -> asyncio.Task:
+    """Get the AI initialization task, starting one unless loaded or in flight"""
+    task = app_state.ai_init_task
+    if task is None or (task.done() and not app_state.ai_loaded):
+        # No attempt yet, or the previous one failed/was cancelled: retry
+        task = asyncio.create_task(initialize_ai_engine(), name="ai-init")
+        app_state.ai_init_task = task
+    return task
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Optimized lifespan with faster startup"""
     logger.info("🚀 Starting RailAdvice AI System...")
+    app_state.start_executors()
     
-    startup_tasks = []
-    
-    # Initialize document manager first (lightweight)
-    startup_tasks.append(initialize_document_manager())
+    # Start AI initialization in background right away
+    get_or_start_ai_init()
     
-    # Start AI initialization in background
-    startup_tasks.append(asyncio.create_task(initialize_ai_engine()))
-    
-    # Wait for document manager, let AI load in background
+    # Wait for document manager (lightweight), let AI load in background
     try:
-        doc_success = await startup_tasks[0]
+        doc_success = await initialize_document_manager()
         if not doc_success:
             logger.warning("⚠️ Document manager failed to initialize")
         else:
@@ -116,12 +190,21 @@ async def lifespan(app: FastAPI):
     # Cleanup
     logger.info("Shutting down RailAdvice AI System...")
 
-    # Cancel background tasks if still running
-    for task in startup_tasks:
-       if hasattr(task, 'done') and not task.done():
-           task.cancel()
-       elif hasattr(task, 'cancel'):
-           task.cancel()
+    # Cancel AI initialization / pending reload if still running
+    for task in (app_state.ai_init_task, app_state.reload_task):
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    app_state.stop_executors()
+
+    # Fold the document WAL into the index snapshots
+    if app_state.doc_manager is not None:
+        try:
+            app_state.doc_manager.close()
+        except Exception as e:
+            logger.error(f"❌ Failed to compact document index: {e}")
 
 # Create FastAPI app with optimized settings
 app = FastAPI(
@@ -129,20 +212,42 @@ app = FastAPI(
     description="AI-powered railway consulting assistant",
     version="3.4.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     # Performance optimizations
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves Server-Sent Events streams uncompressed"""
+    
+    # The compressor would buffer SSE chunks instead of flushing each event
+    uncompressed_paths = {"/api/chat/stream"}
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.uncompressed_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress large chat/document payloads. Added before CORS so CORS is the
+# outer middleware and answers preflights without going through gzip
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Any origin by default; set CORS_ORIGINS (comma-separated) to restrict it
+CORS_ORIGINS = [
+    origin.strip() for origin in os.getenv("CORS_ORIGINS", "*").split(",") if origin.strip()
+] or ["*"]
+
 # Optimized CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configure for production
+    allow_origins=CORS_ORIGINS,  # Configure for production
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],  # Specific methods instead of "*"
     allow_headers=["*"],
-    max_age=600,  # Cache preflight requests
+    max_age=86400,  # Cache preflight requests (browsers clamp to their own maximum)
 )
 
 # ---------------------------
@@ -153,20 +258,19 @@ class DocumentRequest(BaseModel):
     content: str
     doc_type: str = "general"
     category: str = "general" 
-    tags: list[str] = []
-    metadata: dict = {}
+    tags: list[str] = Field(default_factory=list)
+    metadata: dict = Field(default_factory=dict)
     
-    class Config:
-        str_strip_whitespace = True  # Auto-strip whitespace
-        max_anystr_length = 100000  # Prevent massive payloads
+    model_config = ConfigDict(
+        str_strip_whitespace=True,  # Auto-strip whitespace
+        str_max_length=100000,  # Prevent massive payloads
+    )
 
 class ChatMessage(BaseModel):
     message: str
     context: str = "general"
     
-    class Config:
-        str_strip_whitespace = True
-        max_anystr_length = 5000
+    model_config = ConfigDict(str_strip_whitespace=True, str_max_length=5000)
 
 class ChatResponse(BaseModel):
     response: str
@@ -189,21 +293,113 @@ def get_ai_status() -> str:
     else:
         return "error"
 
+def get_cached_doc_count() -> int:
+    """Get document count, refreshed at most once per DOC_COUNT_TTL seconds"""
+    now = time.monotonic()
+    if now - app_state.doc_count_cached_at >= DOC_COUNT_TTL:
+        app_state.doc_count = app_state.doc_manager.count_documents()
+        app_state.doc_count_cached_at = now
+    return app_state.doc_count
+
+def format_sse(data: str, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Events message"""
+    lines = [f"event: {event}"] if event else []
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
+
+def cached_json_response(name: str, key: Hashable, build: Callable[[], dict]) -> Response:
+    """Serve a JSON payload, re-serializing only when its state key changes"""
+    cached = _payload_cache.get(name)
+    if cached is None or cached[0] != key:
+        cached = (key, orjson.dumps(build()))
+        _payload_cache[name] = cached
+    return Response(content=cached[1], media_type="application/json")
+
+def next_stream_chunk(chunks) -> tuple[bool, object]:
+    """Advance a query_stream generator: (False, chunk) or (True, final result)"""
+    try:
+        return False, next(chunks)
+    except StopIteration as stop:
+        return True, stop.value
+
+def invalidate_doc_count():
+    """Force the next get_cached_doc_count() to recount"""
+    app_state.doc_count_cached_at = float("-inf")
+
+def invalidate_chat_cache():
+    """Drop cached answers and stop sharing queries begun before a document change"""
+    app_state.chat_cache.clear()
+    app_state.chat_inflight.clear()
+    app_state.chat_generation += 1
+
+async def record_shared_answer(question: str, result: dict) -> dict:
+    """Record a cached or shared answer in the engine's conversation memory"""
+    remember = getattr(app_state.ai_engine, "remember", None)
+    if remember is not None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(app_state.ai_executor, remember, question, result["answer"])
+    return result
+
+async def run_chat_query(question: str) -> dict:
+    """Run an AI query, sharing in-flight work and recent results for identical questions"""
+    key = hashlib.blake2b(question.encode("utf-8"), digest_size=16).hexdigest()
+    
+    # Answers served without running the engine still count as an exchange
+    # for contextual engines, so follow-up questions keep their history
+    cached = app_state.chat_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        app_state.chat_cache.move_to_end(key)
+        return await record_shared_answer(question, cached[1])
+    
+    # Someone is already asking this exact question; wait for their answer
+    inflight = app_state.chat_inflight.get(key)
+    if inflight is not None:
+        return await record_shared_answer(question, await asyncio.shield(inflight))
+    
+    # Run AI query in thread pool to avoid blocking
+    generation = app_state.chat_generation
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(app_state.ai_executor, app_state.ai_engine.query, question)
+    app_state.chat_inflight[key] = future
+    try:
+        # Shielded so a disconnecting first caller doesn't cancel it for the others
+        result = await asyncio.shield(future)
+    finally:
+        # invalidate_chat_cache may have let a newer query take the slot
+        if app_state.chat_inflight.get(key) is future:
+            del app_state.chat_inflight[key]
+    
+    cacheable = not result.get("loading") and result.get("confidence") not in UNCACHEABLE_CONFIDENCE
+    if cacheable and generation == app_state.chat_generation:
+        app_state.chat_cache[key] = (time.monotonic() + CHAT_CACHE_TTL, result)
+        app_state.chat_cache.move_to_end(key)
+        while len(app_state.chat_cache) > CHAT_CACHE_SIZE:
+            app_state.chat_cache.popitem(last=False)
+    
+    return result
+
+def ai_loading_error() -> HTTPException:
+    """503 asking clients to back off while the AI engine is initializing"""
+    return HTTPException(
+        status_code=503,
+        detail={
+            "message": "AI engine is initializing. Please wait a moment and try again.",
+            "retry_after": AI_LOADING_RETRY_AFTER
+        },
+        headers={"Retry-After": str(AI_LOADING_RETRY_AFTER)},
+    )
+
 async def ensure_ai_ready(timeout: int = 30) -> bool:
     """Ensure AI engine is ready with timeout"""
     if app_state.ai_loaded:
         return True
         
-    if not app_state.ai_loading:
-        # Start initialization if not already running
-        asyncio.create_task(initialize_ai_engine())
-    
-    # Wait for AI to be ready with timeout
-    start_time = asyncio.get_event_loop().time()
-    while app_state.ai_loading:
-        if asyncio.get_event_loop().time() - start_time > timeout:
-            return False
-        await asyncio.sleep(0.5)
+    # Join (or start) the shared initialization; shield it so a timeout here
+    # doesn't cancel the task for everyone else
+    try:
+        await asyncio.wait_for(asyncio.shield(get_or_start_ai_init()), timeout=timeout)
+    except asyncio.TimeoutError:
+        return False
     
     return app_state.ai_loaded
 
@@ -213,7 +409,7 @@ async def ensure_ai_ready(timeout: int = 30) -> bool:
 @app.get("/health")
 async def health():
     """Fast health check"""
-    return {"status": "healthy", "service": "RailAdvice AI"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 @app.get("/api/health")
 async def detailed_health():
@@ -225,7 +421,7 @@ async def detailed_health():
         
         if doc_manager_ready:
             try:
-                doc_count = len(app_state.doc_manager.list_documents())
+                doc_count = get_cached_doc_count()
             except:
                 doc_count = 0
         
@@ -248,17 +444,20 @@ async def root():
         doc_count = 0
         if app_state.doc_manager:
             try:
-                doc_count = len(app_state.doc_manager.list_documents())
+                doc_count = get_cached_doc_count()
             except:
                 pass
-                
-        return {
+        
+        ai_status = get_ai_status()
+        ready = app_state.doc_manager is not None
+        
+        return cached_json_response("root", (doc_count, ai_status, ready), lambda: {
             "message": "RailAdvice AI API", 
             "version": "3.4.0",
             "status": {
                 "documents": doc_count,
-                "ai_engine": get_ai_status(),
-                "ready": app_state.doc_manager is not None
+                "ai_engine": ai_status,
+                "ready": ready
             },
             "endpoints": {
                 "docs": "/docs",
@@ -267,7 +466,7 @@ async def root():
                 "documents": "/api/documents",
                 "ai_status": "/api/ai-status"
             }
-        }
+        })
     except Exception as e:
         logger.error(f"Root endpoint error: {e}")
         return {
@@ -283,14 +482,21 @@ async def root():
 @app.get("/api/ai-status")
 async def ai_status_endpoint():
     """Get AI engine status"""
-    return {
-        "ai_engine_status": get_ai_status(),
-        "ai_loading": app_state.ai_loading,
-        "ai_loaded": app_state.ai_loaded,
-        "doc_manager_ready": app_state.doc_manager is not None,
-        "documents_count": len(app_state.doc_manager.list_documents()) if app_state.doc_manager else 0,
-        "ready_for_chat": get_ai_status() == "ready"
-    }
+    ai_status = get_ai_status()
+    ai_loading = app_state.ai_loading
+    ai_loaded = app_state.ai_loaded
+    doc_manager_ready = app_state.doc_manager is not None
+    doc_count = get_cached_doc_count() if doc_manager_ready else 0
+    
+    key = (ai_status, ai_loading, ai_loaded, doc_manager_ready, doc_count)
+    return cached_json_response("ai_status", key, lambda: {
+        "ai_engine_status": ai_status,
+        "ai_loading": ai_loading,
+        "ai_loaded": ai_loaded,
+        "doc_manager_ready": doc_manager_ready,
+        "documents_count": doc_count,
+        "ready_for_chat": ai_status == "ready"
+    })
 
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
@@ -302,42 +508,31 @@ async def chat(message: ChatMessage):
     
     # Handle loading state
     if ai_status == "loading":
-        return ChatResponse(
-            response="AI engine is initializing. Please wait a moment and try again.",
-            sources=0,
-            confidence="system",
-            ai_status="loading",
-            loading=True
-        )
+        raise ai_loading_error()
     
     # Try to ensure AI is ready
     if ai_status != "ready":
         ai_ready = await ensure_ai_ready(timeout=10)
         if not ai_ready:
-            return ChatResponse(
-                response="AI engine is currently unavailable. Please try again later or contact support.",
-                sources=0,
-                confidence="system",
-                ai_status="error"
-            )
+            return {
+                "response": "AI engine is currently unavailable. Please try again later or contact support.",
+                "sources": 0,
+                "confidence": "system",
+                "ai_status": "error"
+            }
     
     try:
-        logger.info(f"Processing query: {message.message[:100]}...")
+        logger.info("Processing query: %s...", message.message[:100])
         
-        # Run AI query in thread pool to avoid blocking
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(
-            None, 
-            app_state.ai_engine.query, 
-            message.message
-        )
+        result = await run_chat_query(message.message)
         
-        return ChatResponse(
-            response=result["answer"],
-            sources=result.get("sources", 0),
-            confidence=result.get("confidence", "medium"),
-            ai_status="ready"
-        )
+        # Plain dict: response_model still validates it and documents the schema
+        return {
+            "response": result["answer"],
+            "sources": result.get("sources", 0),
+            "confidence": result.get("confidence", "medium"),
+            "ai_status": "ready"
+        }
         
     except Exception as e:
         logger.error(f"Chat processing error: {e}")
@@ -346,6 +541,50 @@ async def chat(message: ChatMessage):
             detail="Sorry, I encountered an error processing your question. Please try again."
         )
 
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """Chat endpoint streaming the answer as Server-Sent Events"""
+    if not message.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    ai_status = get_ai_status()
+    if ai_status == "loading":
+        raise ai_loading_error()
+    if ai_status != "ready" and not await ensure_ai_ready(timeout=10):
+        raise HTTPException(status_code=503, detail="AI engine is currently unavailable. Please try again later.")
+    
+    logger.info("Streaming query: %s...", message.message[:100])
+    chunks = app_state.ai_engine.query_stream(message.message)
+    
+    async def event_stream():
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                # Advance the generator in the thread pool; the first step runs the search
+                done, value = await loop.run_in_executor(
+                    app_state.ai_executor, next_stream_chunk, chunks
+                )
+                if done:
+                    result = value or {}
+                    summary = {
+                        "sources": result.get("sources", 0),
+                        "confidence": result.get("confidence", "medium"),
+                        "ai_status": "ready"
+                    }
+                    yield format_sse(orjson.dumps(summary).decode(), event="done")
+                    break
+                yield format_sse(value)
+        except Exception as e:
+            logger.error(f"Chat streaming error: {e}")
+            yield format_sse("Sorry, I encountered an error processing your question.", event="error")
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Keep proxies (e.g. nginx) from caching or buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # ---------------------------
 # Document management with async
 # ---------------------------
@@ -354,18 +593,21 @@ async def list_documents(limit: int = 100, offset: int = 0):
     """List documents with pagination"""
     if not app_state.doc_manager:
         raise HTTPException(status_code=503, detail="Document manager not available")
+    if limit < 0 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit and offset must be non-negative")
     
     try:
         # Run in thread pool for large document lists
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         documents = await loop.run_in_executor(
-            None,
-            lambda: app_state.doc_manager.list_documents(limit=limit)[offset:offset+limit]
+            app_state.io_executor,
+            functools.partial(app_state.doc_manager.list_documents, limit=limit, offset=offset)
         )
         
         return {
             "documents": documents,
             "count": len(documents),
+            "total": get_cached_doc_count(),
             "offset": offset,
             "limit": limit
         }
@@ -374,17 +616,18 @@ async def list_documents(limit: int = 100, offset: int = 0):
         raise HTTPException(status_code=500, detail="Failed to retrieve documents")
 
 @app.post("/api/documents")
-async def add_document(req: DocumentRequest, background_tasks: BackgroundTasks):
+async def add_document(req: DocumentRequest):
     """Add document with background AI reload"""
     if not app_state.doc_manager:
         raise HTTPException(status_code=503, detail="Document manager not available")
     
     try:
         # Run document addition in thread pool
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         doc_id = await loop.run_in_executor(
-            None,
-            lambda: app_state.doc_manager.add_document(
+            app_state.io_executor,
+            functools.partial(
+                app_state.doc_manager.add_document,
                 title=req.title,
                 content=req.content,
                 doc_type=req.doc_type,
@@ -394,9 +637,12 @@ async def add_document(req: DocumentRequest, background_tasks: BackgroundTasks):
             )
         )
         
+        invalidate_doc_count()
+        invalidate_chat_cache()
+        
         # Reload AI in background if ready
         if app_state.ai_engine and app_state.ai_loaded:
-            background_tasks.add_task(reload_ai_background)
+            schedule_ai_reload()
         
         return {"id": doc_id, "status": "created", "title": req.title}
         
@@ -404,15 +650,29 @@ async def add_document(req: DocumentRequest, background_tasks: BackgroundTasks):
         logger.error(f"Error adding document: {e}")
         raise HTTPException(status_code=500, detail="Failed to add document")
 
+def schedule_ai_reload():
+    """Request an AI document reload, coalescing bursts into a single rebuild"""
+    app_state.reload_pending = True
+    if app_state.reload_task is None or app_state.reload_task.done():
+        app_state.reload_task = asyncio.create_task(reload_ai_background(), name="ai-reload")
+
 async def reload_ai_background():
-    """Background task to reload AI documents"""
-    if app_state.ai_engine and app_state.ai_loaded:
+    """Background task to reload AI documents once uploads settle"""
+    await asyncio.sleep(RELOAD_DEBOUNCE_SECONDS)
+    
+    # Uploads arriving during a reload set the flag again and get one more pass
+    while app_state.reload_pending:
+        app_state.reload_pending = False
+        if not (app_state.ai_engine and app_state.ai_loaded):
+            return
         try:
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             await loop.run_in_executor(
-                None,
+                app_state.ai_executor,
                 app_state.ai_engine.reload_documents
             )
+            # Answers cached since the upload were built from the old document set
+            invalidate_chat_cache()
             logger.info("🔄 AI engine reloaded with updated documents")
         except Exception as e:
             logger.error(f"Failed to reload AI engine: {e}")
@@ -429,7 +689,7 @@ async def force_initialize_ai():
         return {"status": "loading", "message": "AI engine is currently initializing"}
     
     # Start initialization
-    asyncio.create_task(initialize_ai_engine())
+    get_or_start_ai_init()
     return {"status": "started", "message": "AI engine initialization started in background"}
 
 # ---------------------------
@@ -437,43 +697,33 @@ async def force_initialize_ai():
 # ---------------------------
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return {"error": "Endpoint not found", "available_endpoints": ["/", "/docs", "/api/health", "/api/chat"]}
+    return Response(content=NOT_FOUND_BODY, status_code=404, media_type="application/json")
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     logger.error(f"Internal server error: {exc}")
-    return {"error": "Internal server error", "message": "Please try again later"}
+    return Response(content=INTERNAL_ERROR_BODY, status_code=500, media_type="application/json")
 
 if __name__ == "__main__":
     print("🚆 Starting Optimized RailAdvice AI API Server...")
     
-    # Production-ready uvicorn configuration
-    config = {
-        "host": "0.0.0.0",
-        "port": int(os.getenv("PORT", 8000)),
-        "log_level": "info",
-        "access_log": False,  # Disable access logs for performance
-        "workers": 1,  # Single worker for now, scale as needed
-        "timeout_keep_alive": 5,
-        "timeout_graceful_shutdown": 30
-    }
-    
-    # Add performance optimizations only if available
-    if sys.platform != "win32":
-        try:
-            import uvloop
-            config["loop"] = "uvloop"
-        except ImportError:
-            logger.info("uvloop not available, using default asyncio")
-    
-    try:
-        import httptools
-        config["http"] = "httptools"
-    except ImportError:
-        logger.info("httptools not available, using default HTTP parser")
+    # Production-ready uvicorn configuration; uvloop and httptools are hard
+    # requirements (uvloop has no Windows build)
+    config = uvicorn.Config(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 8000)),
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        log_level="info",
+        access_log=False,  # Disable access logs for performance
+        workers=1,  # Single worker for now, scale as needed
+        timeout_keep_alive=5,
+        timeout_graceful_shutdown=30,
+    )
     
     try:
-        uvicorn.run(app, **config)
+        uvicorn.Server(config).run()
     except KeyboardInterrupt:
         print("\n🛑 Server stopped by user")
     except Exception as e:
@@ -1,242 +1,282 @@
-import pandas as pd
+import hashlib
 import json
 import os
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+from types import MappingProxyType
 
-class DataProcessor:
-    def __init__(self, data_dir="./data"):
-        self.data_dir = Path(data_dir)
-        self.projects_dir = self.data_dir / "projects"
-        self.regulations_dir = self.data_dir / "regulations"
-        self.company_dir = self.data_dir / "company"
-        
-        # Create directories
-        os.makedirs(self.projects_dir, exist_ok=True)
-        os.makedirs(self.regulations_dir, exist_ok=True)
-        os.makedirs(self.company_dir, exist_ok=True)
+# Fastest available encoder: orjson, then python-rapidjson, then stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+rapidjson = None
+if orjson is None:
+    try:
+        import rapidjson
+    except ImportError:
+        pass
+
+_MODULE_MTIME = Path(__file__).stat().st_mtime
+
+
+def _dumps(obj, pretty=False):
+    """Serialize obj to UTF-8 JSON bytes (compact unless pretty)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if rapidjson is not None:
+        return rapidjson.dumps(obj, indent=2 if pretty else None, ensure_ascii=False).encode('utf-8')
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+
+
+def _freeze(obj):
+    """Deep read-only view: dicts become mappingproxies, lists become tuples"""
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(value) for value in obj)
+    return obj
+
+
+def _write_json(path, data):
+    """Write serialized JSON bytes to path, skipping the write if unchanged"""
+    # Fast path: the payloads live in this module, so a file written after it
+    # last changed with the same size (compact vs pretty) is already current
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        stat = None
+    if stat is not None and stat.st_mtime >= _MODULE_MTIME and stat.st_size == len(data):
+        return
     
-    def process_complete_railadvice_profile(self):
-        """Complete RailAdvice company profile and knowledge"""
-        
-        company_profile = {
-            "basic_info": {
-                "name": "RailAdvice AS",
-                "founded": "2018",
-                "location": "Oslo, Norge",
-                "website": "www.railadvice.no",
-                "industry": "Jernbanekonsulenter",
-                "employees": "10-20 ansatte",
-                "languages": ["Norsk", "Engelsk", "Svensk", "Dansk"]
-            },
-            
-            "core_competencies": [
-                "RAMS (Reliability, Availability, Maintainability, Safety) analyse",
-                "ETCS (European Train Control System) implementering",
-                "TSI (Technical Specifications for Interoperability) samsvar",
-                "Jernbaneinfrastruktur design og optimalisering",
-                "Sikkerhetsanalyse (HAZOP, FMEA, HAZID)",
-                "Prosjektledelse for jernbaneprosjekter",
-                "Due diligence og teknisk rådgivning",
-                "Regelverk og godkjenningsprosesser",
-                "Rolling stock evaluering og optimalisering",
-                "Depot design og drift"
-            ],
-            
-            "certifications": [
-                "CENELEC sertifiseringer",
-                "EU TSI ekspertise",
-                "ETCS Level 1 og 2 kompetanse",
-                "RAMS analysemetodikk",
-                "Norsk jernbaneregelverk",
-                "Internasjonal jernbanestandard"
-            ],
-            
-            "key_personnel": {
-                "Lars Mortvedt": {
-                    "role": "Senior konsulent / Prosjektleder",
-                    "expertise": ["RAMS", "LCC", "Rolling stock", "Prosjektledelse"],
-                    "experience": "15+ år jernbaneerfaring",
-                    "active_since": "Mai 2019",
-                    "current_projects": ["Flytoget Type 78 RAM/LCC ansvar", "Bane NOR RAMS signalprosjekter"]
-                }
-            },
-            
-            "service_areas": {
-                "RAMS_services": {
-                    "description": "Komplett RAMS analyse og dokumentasjon",
-                    "deliverables": ["RAMS plan", "Sikkerhetsdokumentasjon", "Risikoanalyse"],
-                    "standards": ["EN 50126", "EN 50128", "EN 50129"],
-                    "typical_cost": "500,000 - 2,000,000 NOK per prosjekt"
-                },
-                "ETCS_services": {
-                    "description": "ETCS implementering og optimalisering",
-                    "levels": ["ETCS Level 1", "ETCS Level 2", "ETCS Level 3"],
-                    "deliverables": ["ETCS design", "Kostnad-nytte analyse", "Implementeringsplan"],
-                    "typical_cost": "15-25 millioner NOK per 100km implementering"
-                },
-                "project_management": {
-                    "description": "Prosjektledelse for jernbaneprosjekter",
-                    "project_types": ["Infrastruktur", "Rolling stock", "Signaling", "Depot"],
-                    "methodologies": ["PRINCE2", "PMI", "Jernbanespesifikk"],
-                    "typical_duration": "6-36 måneder"
-                }
-            }
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    
+    # The digest of the last write is kept next to the file, e.g. foo.json.sha
+    digest_file = path.with_name(path.name + ".sha")
+    try:
+        if stat is not None and digest_file.read_bytes() == digest:
+            return
+    except FileNotFoundError:
+        pass
+    
+    # Publish via rename so readers never see a half-written file
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    digest_file.write_bytes(digest)
+
+
+# ---------------------------
+# Static knowledge base content
+# ---------------------------
+# Built once at import. Repeated strings ("Pågående", "RAMS", ...) are shared
+# constants of this module's code object, so each is already stored only once.
+# These are shared by every DataProcessor and must match the *_JSON bytes below,
+# so callers only ever receive the read-only *_VIEW copies.
+_COMPANY_PROFILE = {
+    "basic_info": {
+        "name": "RailAdvice AS",
+        "founded": "2018",
+        "location": "Oslo, Norge",
+        "website": "www.railadvice.no",
+        "industry": "Jernbanekonsulenter",
+        "employees": "10-20 ansatte",
+        "languages": ["Norsk", "Engelsk", "Svensk", "Dansk"]
+    },
+    
+    "core_competencies": [
+        "RAMS (Reliability, Availability, Maintainability, Safety) analyse",
+        "ETCS (European Train Control System) implementering",
+        "TSI (Technical Specifications for Interoperability) samsvar",
+        "Jernbaneinfrastruktur design og optimalisering",
+        "Sikkerhetsanalyse (HAZOP, FMEA, HAZID)",
+        "Prosjektledelse for jernbaneprosjekter",
+        "Due diligence og teknisk rådgivning",
+        "Regelverk og godkjenningsprosesser",
+        "Rolling stock evaluering og optimalisering",
+        "Depot design og drift"
+    ],
+    
+    "certifications": [
+        "CENELEC sertifiseringer",
+        "EU TSI ekspertise",
+        "ETCS Level 1 og 2 kompetanse",
+        "RAMS analysemetodikk",
+        "Norsk jernbaneregelverk",
+        "Internasjonal jernbanestandard"
+    ],
+    
+    "key_personnel": {
+        "Lars Mortvedt": {
+            "role": "Senior konsulent / Prosjektleder",
+            "expertise": ["RAMS", "LCC", "Rolling stock", "Prosjektledelse"],
+            "experience": "15+ år jernbaneerfaring",
+            "active_since": "Mai 2019",
+            "current_projects": ["Flytoget Type 78 RAM/LCC ansvar", "Bane NOR RAMS signalprosjekter"]
         }
-        
-        # Save company profile
-        company_file = self.company_dir / "railadvice_profile.json"
-        with open(company_file, 'w', encoding='utf-8') as f:
-            json.dump(company_profile, f, indent=2, ensure_ascii=False)
-        
-        return company_profile
+    },
     
-    def process_detailed_projects(self):
-        """Detailed project information with costs, timelines, and outcomes"""
-        
-        projects = [
-            {
-                "title": "Fornebu Base Depot - Fullservice depotutvikling",
-                "client": "Prosjekteringsgruppen Fornebubanen",
-                "project_code": "FB-DEPOT-2023",
-                "type": "depot_development",
-                "status": "Pågående",
-                "start_date": "2023-01-15",
-                "estimated_completion": "2024-12-31",
-                "description": "Komplett utvikling av depot med verksted, renhold og hensetting for Fornebubanen. Inkluderer teknisk design, RAMS analyse og prosjektledelse.",
-                "scope": [
-                    "Depotlayout og optimalisering",
-                    "Verkstedutforming for vedlikehold",
-                    "Renholdsanlegg design",
-                    "Hensettingskapasitet beregning",
-                    "RAMS dokumentasjon for depot"
-                ],
-                "technologies": ["depot", "workshop", "maintenance", "cleaning_systems"],
-                "deliverables": ["Tekniske tegninger", "RAMS rapport", "Kostnadsanalyse"],
-                "budget": "Konfidensielt - kontakt for estimat",
-                "year": 2023,
-                "outcome": "Pågående - foreløpige resultater positive"
-            },
-            
-            {
-                "title": "Flytoget Type 78 - RAMS og LCC optimalisering",
-                "client": "Flytoget AS",
-                "project_code": "FLY-T78-2019",
-                "type": "rolling_stock",
-                "status": "Pågående (langtidskontrakt)",
-                "start_date": "2019-05-01",
-                "description": "Teknisk bistand for nye flytogsett Type 78. Lars Mortvedt har RAMS/LCC ansvar og deltar i designoptimalisering.",
-                "scope": [
-                    "RAMS analyse for Type 78",
-                    "Life Cycle Cost (LCC) beregninger",
-                    "Vedlikeholdsstrategi utvikling",
-                    "Pålitelighetsvurderinger",
-                    "Teknisk support til leverandør"
-                ],
-                "technologies": ["RAM", "LCC", "rolling_stock", "reliability_analysis"],
-                "consultant": "Lars Mortvedt",
-                "key_metrics": {
-                    "target_availability": "98.5%",
-                    "mtbf_target": "50,000 km",
-                    "lifecycle_years": "30 år"
-                },
-                "estimated_value": "450 millioner NOK (totalt Type 78 program)",
-                "railadvice_fee": "Konfidensielt - flerårig rammeavtale",
-                "year": 2019,
-                "outcome": "Suksess - forbedret pålitelighet og reduserte LCC-kostnader"
-            },
-            
-            {
-                "title": "SJ Norge Materiellavdeling - Kontraktsansvar Trafikkpakke 2",
-                "client": "SJ Norge AS",
-                "project_code": "SJ-TP2-2020",
-                "type": "contract_management",
-                "status": "Avsluttet",
-                "start_date": "2020-03-01",
-                "end_date": "2021-08-31",
-                "description": "Kontraktsansvarlig for trafikkpakke 2 omfattende Dovrebanen og dieselstrekninger nord. Teknisk ledelse av materiell og drift.",
-                "scope": [
-                    "Materiellstrategi for Dovrebanen",
-                    "Dieseltog optimalisering",
-                    "Vedlikeholdsplanlegging",
-                    "Kontraktsoppfølging",
-                    "Teknisk rådgivning til drift"
-                ],
-                "routes": ["Dovrebanen", "Nordlandsbanen", "Meråkerbanen"],
-                "technologies": ["contract", "diesel", "operations", "maintenance_planning"],
-                "key_results": [
-                    "15% forbedring i punktlighet",
-                    "12% reduksjon i vedlikeholdskostnader",
-                    "Forbedret materiellytelse"
-                ],
-                "contract_value": "Konfidensielt",
-                "year": 2020,
-                "outcome": "Suksess - kontrakt levert i henhold til plan"
-            },
-            
-            {
-                "title": "Bybanen Utvikling - Sikkerhetssjef (Rammeavtale)",
-                "client": "Bybanen Utvikling AS",
-                "project_code": "BY-SIKK-2023",
-                "type": "safety_management",
-                "status": "Aktiv rammeavtale",
-                "start_date": "2023-06-01",
-                "description": "Rammeavtale som sikkerhetssjef for Bybanen Utvikling. Ansvar for sikkerhetsstyring og RAMS i bybaneutvikling.",
-                "scope": [
-                    "Sikkerhetsledelse og -styring",
-                    "HAZOP og HAZID gjennomføring",
-                    "Risikovurdering bybaneprosjekter",
-                    "Safety case utarbeidelse",
-                    "Koordinering med myndigheter"
-                ],
-                "technologies": ["safety", "light_rail", "management", "hazop", "risk_assessment"],
-                "deliverables": ["Sikkerhetspolitikk", "RAMS dokumentasjon", "Safety cases"],
-                "framework_value": "Rammeavtale - timepris basis",
-                "year": 2023,
-                "outcome": "Pågående - god fremdrift i sikkerhetsstyring"
-            },
-            
-            {
-                "title": "Bane NOR RAMS Signal - Multippel signalprosjekter",
-                "client": "Bane NOR SF",
-                "project_code": "BN-RAMS-SIG-2024",
-                "type": "RAMS_analysis",
-                "status": "Pågående",
-                "start_date": "2024-01-01",
-                "description": "RAMS-rådgiving i flere signalprosjekter for Bane NOR. Omfatter både nye installasjoner og oppgraderinger.",
-                "scope": [
-                    "RAMS analyse signalsystemer",
-                    "FMEA for kritiske komponenter",
-                    "Sikkerhetsdokumentasjon",
-                    "CSM-RA samsvarsvurdering",
-                    "Teknisk support under installasjon"
-                ],
-                "signal_types": ["ETCS Level 2", "ATC", "Conventional signaling"],
-                "technologies": ["RAMS", "signaling", "safety", "ETCS", "FMEA"],
-                "geographical_scope": ["Østlandet", "Sørlandet", "Vestlandet"],
-                "estimated_value": "2-5 millioner NOK (total portefølje)",
-                "year": 2024,
-                "outcome": "Pågående - flere milepæler levert i tide"
-            }
-        ]
-        
-        # Save detailed projects
-        projects_file = self.projects_dir / "detailed_projects.json"
-        with open(projects_file, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ Processed {len(projects)} detailed projects")
-        return projects
+    "service_areas": {
+        "RAMS_services": {
+            "description": "Komplett RAMS analyse og dokumentasjon",
+            "deliverables": ["RAMS plan", "Sikkerhetsdokumentasjon", "Risikoanalyse"],
+            "standards": ["EN 50126", "EN 50128", "EN 50129"],
+            "typical_cost": "500,000 - 2,000,000 NOK per prosjekt"
+        },
+        "ETCS_services": {
+            "description": "ETCS implementering og optimalisering",
+            "levels": ["ETCS Level 1", "ETCS Level 2", "ETCS Level 3"],
+            "deliverables": ["ETCS design", "Kostnad-nytte analyse", "Implementeringsplan"],
+            "typical_cost": "15-25 millioner NOK per 100km implementering"
+        },
+        "project_management": {
+            "description": "Prosjektledelse for jernbaneprosjekter",
+            "project_types": ["Infrastruktur", "Rolling stock", "Signaling", "Depot"],
+            "methodologies": ["PRINCE2", "PMI", "Jernbanespesifikk"],
+            "typical_duration": "6-36 måneder"
+        }
+    }
+}
+
+_PROJECTS = [
+    {
+        "title": "Fornebu Base Depot - Fullservice depotutvikling",
+        "client": "Prosjekteringsgruppen Fornebubanen",
+        "project_code": "FB-DEPOT-2023",
+        "type": "depot_development",
+        "status": "Pågående",
+        "start_date": "2023-01-15",
+        "estimated_completion": "2024-12-31",
+        "description": "Komplett utvikling av depot med verksted, renhold og hensetting for Fornebubanen. Inkluderer teknisk design, RAMS analyse og prosjektledelse.",
+        "scope": [
+            "Depotlayout og optimalisering",
+            "Verkstedutforming for vedlikehold",
+            "Renholdsanlegg design",
+            "Hensettingskapasitet beregning",
+            "RAMS dokumentasjon for depot"
+        ],
+        "technologies": ["depot", "workshop", "maintenance", "cleaning_systems"],
+        "deliverables": ["Tekniske tegninger", "RAMS rapport", "Kostnadsanalyse"],
+        "budget": "Konfidensielt - kontakt for estimat",
+        "year": 2023,
+        "outcome": "Pågående - foreløpige resultater positive"
+    },
     
-    def process_technical_knowledge(self):
-        """Detailed technical knowledge and regulations"""
-        
-        technical_knowledge = [
-            {
-                "title": "ETCS Level 2 - Implementeringskrav og kostnader",
-                "category": "signaling",
-                "code": "ETCS-L2-IMPL",
-                "content": """ETCS Level 2 krever Radio Block Centre (RBC), GSM-R kommunikasjon, 
+    {
+        "title": "Flytoget Type 78 - RAMS og LCC optimalisering",
+        "client": "Flytoget AS",
+        "project_code": "FLY-T78-2019",
+        "type": "rolling_stock",
+        "status": "Pågående (langtidskontrakt)",
+        "start_date": "2019-05-01",
+        "description": "Teknisk bistand for nye flytogsett Type 78. Lars Mortvedt har RAMS/LCC ansvar og deltar i designoptimalisering.",
+        "scope": [
+            "RAMS analyse for Type 78",
+            "Life Cycle Cost (LCC) beregninger",
+            "Vedlikeholdsstrategi utvikling",
+            "Pålitelighetsvurderinger",
+            "Teknisk support til leverandør"
+        ],
+        "technologies": ["RAM", "LCC", "rolling_stock", "reliability_analysis"],
+        "consultant": "Lars Mortvedt",
+        "key_metrics": {
+            "target_availability": "98.5%",
+            "mtbf_target": "50,000 km",
+            "lifecycle_years": "30 år"
+        },
+        "estimated_value": "450 millioner NOK (totalt Type 78 program)",
+        "railadvice_fee": "Konfidensielt - flerårig rammeavtale",
+        "year": 2019,
+        "outcome": "Suksess - forbedret pålitelighet og reduserte LCC-kostnader"
+    },
+    
+    {
+        "title": "SJ Norge Materiellavdeling - Kontraktsansvar Trafikkpakke 2",
+        "client": "SJ Norge AS",
+        "project_code": "SJ-TP2-2020",
+        "type": "contract_management",
+        "status": "Avsluttet",
+        "start_date": "2020-03-01",
+        "end_date": "2021-08-31",
+        "description": "Kontraktsansvarlig for trafikkpakke 2 omfattende Dovrebanen og dieselstrekninger nord. Teknisk ledelse av materiell og drift.",
+        "scope": [
+            "Materiellstrategi for Dovrebanen",
+            "Dieseltog optimalisering",
+            "Vedlikeholdsplanlegging",
+            "Kontraktsoppfølging",
+            "Teknisk rådgivning til drift"
+        ],
+        "routes": ["Dovrebanen", "Nordlandsbanen", "Meråkerbanen"],
+        "technologies": ["contract", "diesel", "operations", "maintenance_planning"],
+        "key_results": [
+            "15% forbedring i punktlighet",
+            "12% reduksjon i vedlikeholdskostnader",
+            "Forbedret materiellytelse"
+        ],
+        "contract_value": "Konfidensielt",
+        "year": 2020,
+        "outcome": "Suksess - kontrakt levert i henhold til plan"
+    },
+    
+    {
+        "title": "Bybanen Utvikling - Sikkerhetssjef (Rammeavtale)",
+        "client": "Bybanen Utvikling AS",
+        "project_code": "BY-SIKK-2023",
+        "type": "safety_management",
+        "status": "Aktiv rammeavtale",
+        "start_date": "2023-06-01",
+        "description": "Rammeavtale som sikkerhetssjef for Bybanen Utvikling. Ansvar for sikkerhetsstyring og RAMS i bybaneutvikling.",
+        "scope": [
+            "Sikkerhetsledelse og -styring",
+            "HAZOP og HAZID gjennomføring",
+            "Risikovurdering bybaneprosjekter",
+            "Safety case utarbeidelse",
+            "Koordinering med myndigheter"
+        ],
+        "technologies": ["safety", "light_rail", "management", "hazop", "risk_assessment"],
+        "deliverables": ["Sikkerhetspolitikk", "RAMS dokumentasjon", "Safety cases"],
+        "framework_value": "Rammeavtale - timepris basis",
+        "year": 2023,
+        "outcome": "Pågående - god fremdrift i sikkerhetsstyring"
+    },
+    
+    {
+        "title": "Bane NOR RAMS Signal - Multippel signalprosjekter",
+        "client": "Bane NOR SF",
+        "project_code": "BN-RAMS-SIG-2024",
+        "type": "RAMS_analysis",
+        "status": "Pågående",
+        "start_date": "2024-01-01",
+        "description": "RAMS-rådgiving i flere signalprosjekter for Bane NOR. Omfatter både nye installasjoner og oppgraderinger.",
+        "scope": [
+            "RAMS analyse signalsystemer",
+            "FMEA for kritiske komponenter",
+            "Sikkerhetsdokumentasjon",
+            "CSM-RA samsvarsvurdering",
+            "Teknisk support under installasjon"
+        ],
+        "signal_types": ["ETCS Level 2", "ATC", "Conventional signaling"],
+        "technologies": ["RAMS", "signaling", "safety", "ETCS", "FMEA"],
+        "geographical_scope": ["Østlandet", "Sørlandet", "Vestlandet"],
+        "estimated_value": "2-5 millioner NOK (total portefølje)",
+        "year": 2024,
+        "outcome": "Pågående - flere milepæler levert i tide"
+    }
+]
+
+_TECHNICAL_KNOWLEDGE = [
+    {
+        "title": "ETCS Level 2 - Implementeringskrav og kostnader",
+        "category": "signaling",
+        "code": "ETCS-L2-IMPL",
+        "content": """ETCS Level 2 krever Radio Block Centre (RBC), GSM-R kommunikasjon, 
                 onboard-enheter med SIL-4 sertifisering, og baliser minimum hver 1000m. 
                 
                 Typiske implementeringskostnader:
@@ -248,16 +288,16 @@ class DataProcessor:
                 Total kostnad: 15-25 millioner NOK per 100km strekning.
                 
                 Implementeringstid: 24-36 måneder for kompleks strekning.""",
-                "applications": ["Hovedbaner", "Høyhastighet", "Tung godstrafikk"],
-                "benefits": ["Økt kapasitet", "Forbedret sikkerhet", "Reduserte driftskostnader"],
-                "challenges": ["Høye investeringskostnader", "Kompleks integrasjon", "GSM-R avhengighet"]
-            },
-            
-            {
-                "title": "RAMS metodikk - EN 50126 implementering",
-                "category": "safety",
-                "code": "RAMS-EN50126",
-                "content": """EN 50126 definerer RAMS-krav for jernbanesystemer:
+        "applications": ["Hovedbaner", "Høyhastighet", "Tung godstrafikk"],
+        "benefits": ["Økt kapasitet", "Forbedret sikkerhet", "Reduserte driftskostnader"],
+        "challenges": ["Høye investeringskostnader", "Kompleks integrasjon", "GSM-R avhengighet"]
+    },
+    
+    {
+        "title": "RAMS metodikk - EN 50126 implementering",
+        "category": "safety",
+        "code": "RAMS-EN50126",
+        "content": """EN 50126 definerer RAMS-krav for jernbanesystemer:
                 
                 Reliability: MTBF > 50,000 timer for kritiske systemer
                 Availability: 99.9% for persontransport, 99.5% for godstransport  
@@ -272,16 +312,16 @@ class DataProcessor:
                 5. Verifikasjon og validering (6-18 måneder)
                 
                 Typisk kostnad: 500,000 - 2,000,000 NOK per prosjekt.""",
-                "methodologies": ["HAZOP", "HAZID", "FMEA", "FTA", "SSHA"],
-                "deliverables": ["RAMS plan", "Safety case", "Hazard log", "FMEA rapport"],
-                "certification": "Uavhengig Safety Assessor (ISA) påkrevd"
-            },
-            
-            {
-                "title": "TSI Infrastructure - Tekniske krav infrastruktur",
-                "category": "infrastructure", 
-                "code": "TSI-INF-2023",
-                "content": """TSI Infrastructure definerer tekniske krav for jernbaneinfrastruktur:
+        "methodologies": ["HAZOP", "HAZID", "FMEA", "FTA", "SSHA"],
+        "deliverables": ["RAMS plan", "Safety case", "Hazard log", "FMEA rapport"],
+        "certification": "Uavhengig Safety Assessor (ISA) påkrevd"
+    },
+    
+    {
+        "title": "TSI Infrastructure - Tekniske krav infrastruktur",
+        "category": "infrastructure", 
+        "code": "TSI-INF-2023",
+        "content": """TSI Infrastructure definerer tekniske krav for jernbaneinfrastruktur:
                 
                 Sporvidde: 1435mm (normalspor) ±2mm toleranse
                 Lastefri profil: Minimum GA struktur, GC for høyhastighetsbaner
@@ -298,16 +338,16 @@ class DataProcessor:
                 Vedlikeholdsintervall: 5-8 år sporstabilisering
                 
                 Kostnad ny bane: 150-300 millioner NOK per km (avhenger av terreng)""",
-                "standards": ["EN 13848", "prEN 16432", "UIC 719"],
-                "testing": ["Geometrimåling", "Ballast-tetthet", "Dreneringskapasitet"],
-                "compliance": "EU-kommisjon godkjenning påkrevd"
-            },
-            
-            {
-                "title": "Rolling Stock LCC - Life Cycle Cost analyse", 
-                "category": "rolling_stock",
-                "code": "RS-LCC-METHOD",
-                "content": """Life Cycle Cost analyse for rullende materiell:
+        "standards": ["EN 13848", "prEN 16432", "UIC 719"],
+        "testing": ["Geometrimåling", "Ballast-tetthet", "Dreneringskapasitet"],
+        "compliance": "EU-kommisjon godkjenning påkrevd"
+    },
+    
+    {
+        "title": "Rolling Stock LCC - Life Cycle Cost analyse", 
+        "category": "rolling_stock",
+        "code": "RS-LCC-METHOD",
+        "content": """Life Cycle Cost analyse for rullende materiell:
                 
                 CAPEX (Anskaffelse): 40-60% av total LCC
                 - Nye tog: 25-45 millioner NOK per enhet
@@ -326,27 +366,16 @@ class DataProcessor:
                 - Komponentstandardisering: 10-20% lavere reservedelskostnad
                 
                 ROI-periode: 8-15 år for effektivitetstiltak""",
-                "analysis_tools": ["LCC-kalkulatorer", "Risikosimulering", "Sensitivitetsanalyse"],
-                "key_factors": ["Tilgjengelighet", "Pålitelighet", "Energiforbruk", "Vedlikeholdskostnad"]
-            }
-        ]
-        
-        # Save technical knowledge
-        tech_file = self.regulations_dir / "technical_knowledge.json"
-        with open(tech_file, 'w', encoding='utf-8') as f:
-            json.dump(technical_knowledge, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ Processed {len(technical_knowledge)} technical knowledge articles")
-        return technical_knowledge
-    
-    def process_market_insights(self):
-        """Market insights and industry knowledge"""
-        
-        market_data = [
-            {
-                "title": "Norsk jernbanemarked - Status og trender 2024",
-                "category": "market_analysis",
-                "content": """Norsk jernbanemarked verdi: 25-30 milliarder NOK årlig
+        "analysis_tools": ["LCC-kalkulatorer", "Risikosimulering", "Sensitivitetsanalyse"],
+        "key_factors": ["Tilgjengelighet", "Pålitelighet", "Energiforbruk", "Vedlikeholdskostnad"]
+    }
+]
+
+_MARKET_DATA = [
+    {
+        "title": "Norsk jernbanemarked - Status og trender 2024",
+        "category": "market_analysis",
+        "content": """Norsk jernbanemarked verdi: 25-30 milliarder NOK årlig
                 
                 Vekstområder:
                 - ETCS modernisering: 8-12 milliarder NOK (2024-2030)
@@ -362,14 +391,14 @@ class DataProcessor:
                 
                 Konsulentmarked: 2-3 milliarder NOK årlig
                 RailAdvice markedsandel: Estimert 1-2% (spesialisert nisje)""",
-                "trends": ["Digitalisering", "Bærekraft", "Automatisering", "ETCS Level 3"],
-                "opportunities": ["Smart vedlikehold", "Energioptimalisering", "Kapasitetsøkning"]
-            },
-            
-            {
-                "title": "ETCS markedet i Norden - Muligheter og utfordringer",
-                "category": "technology_market",
-                "content": """ETCS implementering Norden 2024-2035:
+        "trends": ["Digitalisering", "Bærekraft", "Automatisering", "ETCS Level 3"],
+        "opportunities": ["Smart vedlikehold", "Energioptimalisering", "Kapasitetsøkning"]
+    },
+    
+    {
+        "title": "ETCS markedet i Norden - Muligheter og utfordringer",
+        "category": "technology_market",
+        "content": """ETCS implementering Norden 2024-2035:
                 
                 Norge: 4,000 km hovedbaner (60% implementert)
                 Sverige: 15,000 km (25% implementert) 
@@ -386,44 +415,215 @@ class DataProcessor:
                 
                 Konkurranse: Større internasjonale konsulenter
                 Fordeler: Lokal tilstedeværelse og særnorske forhold""",
-                "competitors": ["Atkins", "COWI", "Ramboll", "WSP"],
-                "differentiators": ["RAMS-ekspertise", "Kostnadseffektivitet", "Lokalkunnskap"]
-            }
-        ]
+        "competitors": ["Atkins", "COWI", "Ramboll", "WSP"],
+        "differentiators": ["RAMS-ekspertise", "Kostnadseffektivitet", "Lokalkunnskap"]
+    }
+]
+
+# Serialized once at import; DataProcessor(pretty=True) re-encodes on demand
+_COMPANY_PROFILE_JSON = _dumps(_COMPANY_PROFILE)
+_PROJECTS_JSON = _dumps(_PROJECTS)
+_TECHNICAL_KNOWLEDGE_JSON = _dumps(_TECHNICAL_KNOWLEDGE)
+_MARKET_DATA_JSON = _dumps(_MARKET_DATA)
+
+# Deep read-only views handed to callers, built once
+_COMPANY_PROFILE_VIEW = _freeze(_COMPANY_PROFILE)
+_PROJECTS_VIEW = _freeze(_PROJECTS)
+_TECHNICAL_KNOWLEDGE_VIEW = _freeze(_TECHNICAL_KNOWLEDGE)
+_MARKET_DATA_VIEW = _freeze(_MARKET_DATA)
+
+# All four sections in one document, for process_all
+_KNOWLEDGE_BASE = {
+    "company_profile": _COMPANY_PROFILE,
+    "projects": _PROJECTS,
+    "technical_knowledge": _TECHNICAL_KNOWLEDGE,
+    "market_insights": _MARKET_DATA,
+}
+_KNOWLEDGE_BASE_VIEW = MappingProxyType({
+    "company_profile": _COMPANY_PROFILE_VIEW,
+    "projects": _PROJECTS_VIEW,
+    "technical_knowledge": _TECHNICAL_KNOWLEDGE_VIEW,
+    "market_insights": _MARKET_DATA_VIEW,
+})
+
+
+class _LazyKnowledgeBase(Mapping):
+    """Read-only mapping that runs each section's loader on first access
+
+    Sections are deep read-only views, so no caller can change what later
+    callers (or the serialized files) see, and repeat lookups are one dict lookup.
+    """
+    
+    def __init__(self, loaders):
+        self._loaders = loaders
+        self._sections = {}
+    
+    def __getitem__(self, key):
+        if key not in self._sections:
+            self._sections[key] = self._loaders[key]()
+        return self._sections[key]
+    
+    def __iter__(self):
+        return iter(self._loaders)
+    
+    def __len__(self):
+        return len(self._loaders)
+
+
+class DataProcessor:
+    # Output subdirectories, in the order of the *_dir attributes
+    _SUBDIRS = ("projects", "regulations", "company")
+    # Data directories whose subdirectories an earlier instance already created
+    _created_dirs = set()
+    
+    def __init__(self, data_dir="./data", pretty=False, verbose=True):
+        # Output is read by the AI loader, so it's written compact unless
+        # pretty=True is requested for debugging
+        self.pretty = pretty
+        # verbose=False silences the progress output for library callers
+        self.verbose = verbose
+        self.data_dir = Path(data_dir)
+        dirs = tuple(self.data_dir / name for name in self._SUBDIRS)
+        self.projects_dir, self.regulations_dir, self.company_dir = dirs
+        
+        # Pending (path, data) writes while save_all batches its output
+        self._batch = None
+        # Lazy, read-only result of the first load_all_data call
+        self._all_data_cache = None
+        
+        # Create directories (once per data_dir and process)
+        if self.data_dir not in DataProcessor._created_dirs:
+            for directory in dirs:
+                directory.mkdir(parents=True, exist_ok=True)
+            DataProcessor._created_dirs.add(self.data_dir)
+    
+    def _save_json(self, path, obj, data):
+        """Write obj (pre-serialized as data) to path, or queue it when a batch is open"""
+        if self.pretty:
+            data = _dumps(obj, pretty=True)
+        if self._batch is not None:
+            self._batch.append((path, data))
+        else:
+            _write_json(path, data)
+    
+    def _flush_batch(self):
+        """Write all queued files and close the batch"""
+        batch, self._batch = self._batch or [], None
+        if len(batch) < 2:
+            for path, data in batch:
+                _write_json(path, data)
+            return
+        
+        # The files are independent, so write them concurrently;
+        # list() re-raises the first failure
+        with ThreadPoolExecutor(max_workers=len(batch)) as executor:
+            list(executor.map(lambda item: _write_json(*item), batch))
+    
+    def process_complete_railadvice_profile(self):
+        """Complete RailAdvice company profile and knowledge"""
+        
+        # Save company profile
+        company_file = self.company_dir / "railadvice_profile.json"
+        self._save_json(company_file, _COMPANY_PROFILE, _COMPANY_PROFILE_JSON)
+        
+        return _COMPANY_PROFILE_VIEW
+    
+    def process_detailed_projects(self):
+        """Detailed project information with costs, timelines, and outcomes"""
+        
+        # Save detailed projects
+        projects_file = self.projects_dir / "detailed_projects.json"
+        self._save_json(projects_file, _PROJECTS, _PROJECTS_JSON)
+        
+        if self.verbose:
+            print(f"✅ Processed {len(_PROJECTS)} detailed projects")
+        return _PROJECTS_VIEW
+    
+    def process_technical_knowledge(self):
+        """Detailed technical knowledge and regulations"""
+        
+        # Save technical knowledge
+        tech_file = self.regulations_dir / "technical_knowledge.json"
+        self._save_json(tech_file, _TECHNICAL_KNOWLEDGE, _TECHNICAL_KNOWLEDGE_JSON)
+        
+        if self.verbose:
+            print(f"✅ Processed {len(_TECHNICAL_KNOWLEDGE)} technical knowledge articles")
+        return _TECHNICAL_KNOWLEDGE_VIEW
+    
+    def process_market_insights(self):
+        """Market insights and industry knowledge"""
         
         # Save market insights
         market_file = self.company_dir / "market_insights.json" 
-        with open(market_file, 'w', encoding='utf-8') as f:
-            json.dump(market_data, f, indent=2, ensure_ascii=False)
+        self._save_json(market_file, _MARKET_DATA, _MARKET_DATA_JSON)
         
-        print(f"✅ Processed {len(market_data)} market insight articles")
-        return market_data
+        if self.verbose:
+            print(f"✅ Processed {len(_MARKET_DATA)} market insight articles")
+        return _MARKET_DATA_VIEW
     
-    def load_all_data(self):
-        """Load all processed data for AI training"""
-        all_data = {}
-        
-        # Load company profile
-        all_data['company_profile'] = self.process_complete_railadvice_profile()
+    def process_all(self):
+        """Write the complete knowledge base as a single knowledge_base.json"""
+        kb_file = self.data_dir / "knowledge_base.json"
+        # Spliced from the already-encoded sections rather than encoded again
+        sections = (
+            (b'company_profile', _COMPANY_PROFILE_JSON),
+            (b'projects', _PROJECTS_JSON),
+            (b'technical_knowledge', _TECHNICAL_KNOWLEDGE_JSON),
+            (b'market_insights', _MARKET_DATA_JSON),
+        )
+        data = b'{' + b','.join(b'"%s":%s' % section for section in sections) + b'}'
+        self._save_json(kb_file, _KNOWLEDGE_BASE, data)
         
-        # Load projects
-        all_data['projects'] = self.process_detailed_projects()
+        if self.verbose:
+            print(f"✅ Processed knowledge base with {len(_KNOWLEDGE_BASE)} sections")
+        return _KNOWLEDGE_BASE_VIEW
+    
+    def save_all(self):
+        """Process every section now, writing the four output files together"""
+        self._batch = []
+        try:
+            for process in (
+                self.process_complete_railadvice_profile,
+                self.process_detailed_projects,
+                self.process_technical_knowledge,
+                self.process_market_insights,
+            ):
+                process()
+        finally:
+            self._flush_batch()
+    
+    def load_all_data(self):
+        """Load all processed data for AI training
         
-        # Load technical knowledge
-        all_data['technical_knowledge'] = self.process_technical_knowledge()
+        Sections are processed lazily: each one's output file is written the
+        first time it is read from the returned mapping (use save_all() to
+        write them all up front).
+        """
+        if self._all_data_cache is not None:
+            return self._all_data_cache
         
-        # Load market insights
-        all_data['market_insights'] = self.process_market_insights()
+        all_data = _LazyKnowledgeBase({
+            'company_profile': self.process_complete_railadvice_profile,
+            'projects': self.process_detailed_projects,
+            'technical_knowledge': self.process_technical_knowledge,
+            'market_insights': self.process_market_insights,
+        })
         
-        print("📊 Complete RailAdvice knowledge base loaded!")
-        print(f"   - Company profile: {len(all_data['company_profile'])} sections")
-        print(f"   - Projects: {len(all_data['projects'])} detailed projects")
-        print(f"   - Technical knowledge: {len(all_data['technical_knowledge'])} articles")
-        print(f"   - Market insights: {len(all_data['market_insights'])} reports")
+        if self.verbose:
+            # Counted from the constants so the summary doesn't load any section
+            print(
+                "📊 Complete RailAdvice knowledge base loaded!\n"
+                f"   - Company profile: {len(_COMPANY_PROFILE)} sections\n"
+                f"   - Projects: {len(_PROJECTS)} detailed projects\n"
+                f"   - Technical knowledge: {len(_TECHNICAL_KNOWLEDGE)} articles\n"
+                f"   - Market insights: {len(_MARKET_DATA)} reports"
+            )
         
-        return all_data
+        self._all_data_cache = all_data
+        return self._all_data_cache
 
 if __name__ == "__main__":
     processor = DataProcessor()
+    processor.save_all()
     all_data = processor.load_all_data()
     print("\n🎯  data processing complete!")
\ No newline at end of file
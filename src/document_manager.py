@@ -1,13 +1,126 @@
-import json
+import asyncio
+import bisect
+import heapq
+import mmap
 import os
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List, Dict
 import uuid
 import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import aiofiles
+import orjson
+
+
+def _ngrams(text: str, n: int = 3) -> set:
+    """Distinct lowercased n-grams of text"""
+    text = text.lower()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _doc_ngrams(title: str, tags: List[str], content: str) -> set:
+    """Trigrams of every field search_documents matches a query against"""
+    grams = _ngrams(title) | _ngrams(content)
+    for tag in tags:
+        grams |= _ngrams(tag)
+    return grams
+
+
+def _json_files(directory: Path):
+    """*.json files directly in directory (os.scandir instead of Path.glob)"""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file():
+                yield Path(entry.path)
+
+
+def _json_default(obj):
+    """Serialize the in-memory posting sets as sorted lists"""
+    if isinstance(obj, set):
+        return sorted(obj)
+    raise TypeError
+
+
+def _lowered_fields(doc_info: Dict) -> tuple:
+    """Lowercased (title, tags) that search_documents matches against"""
+    return doc_info["title"].lower(), [tag.lower() for tag in doc_info["tags"]]
+
+
+class _IndexState:
+    """One published version of the document index and everything derived from it
+
+    Readers bind manager._state once and use it for the whole call. Writers
+    change a copy() and publish it with a single assignment, so a reader
+    never sees a half-applied mutation.
+    """
+
+    __slots__ = (
+        "index", "search_index", "ngrams", "lowered", "by_created",
+        "type_counts", "category_counts", "_owned",
+    )
+
+    def __init__(self, index: Dict, search_index: Dict):
+        documents = index["documents"]
+        self.index = index
+        self.search_index = search_index
+        # trigram -> sorted doc_ids; in memory only, built on the first search
+        self.ngrams = None
+        # doc_id -> _lowered_fields(doc); kept in memory only, off the records
+        self.lowered = {doc_id: _lowered_fields(doc_info) for doc_id, doc_info in documents.items()}
+        # (created_at, doc_id) in ascending order, for list_documents
+        self.by_created = sorted((doc_info["created_at"], doc_id) for doc_id, doc_info in documents.items())
+        # Per-type/category document counts, for get_stats
+        self.type_counts = Counter(doc.get("type", "unknown") for doc in documents.values())
+        self.category_counts = Counter(doc.get("category", "unknown") for doc in documents.values())
+        # Not published yet, so every posting may be changed in place
+        self._owned = None
+
+    def copy(self) -> "_IndexState":
+        """Working copy; postings stay shared until posting() copies them"""
+        state = _IndexState.__new__(_IndexState)
+        state.index = {
+            **self.index,
+            "documents": dict(self.index["documents"]),
+            "metadata": dict(self.index["metadata"]),
+        }
+        state.search_index = {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in self.search_index.items()
+        }
+        state.ngrams = dict(self.ngrams) if self.ngrams is not None else None
+        state.lowered = dict(self.lowered)
+        state.by_created = list(self.by_created)
+        state.type_counts = self.type_counts.copy()
+        state.category_counts = self.category_counts.copy()
+        # id -> posting created for this copy (held so the ids stay unique)
+        state._owned = {}
+        return state
+
+    def posting(self, table: Dict, key: str, factory):
+        """table[key] for in-place changes, copied first if a published state shares it"""
+        value = table.get(key)
+        if self._owned is None:
+            if value is None:
+                value = table[key] = factory()
+            return value
+        if id(value) not in self._owned:
+            value = table[key] = factory(value) if value is not None else factory()
+            self._owned[id(value)] = value
+        return value
 
 
 class EnhancedFileDocumentManager:
+    # Mutations appended to the WAL before the snapshots are rewritten
+    COMPACT_EVERY = 1000
+    # Document contents kept in memory (LRU)
+    CONTENT_CACHE_SIZE = 1024
+    # Content files open at once in aload_all_documents
+    LOAD_CONCURRENCY = 64
+
     def __init__(self, docs_dir="./documents"):
         self.docs_dir = Path(docs_dir)
         self.docs_dir.mkdir(parents=True, exist_ok=True)
@@ -22,89 +135,292 @@ class EnhancedFileDocumentManager:
 
         self.index_file = self.docs_dir / "document_index.json"
         self.search_index_file = self.docs_dir / "search_index.json"
-
-        # Thread lock for concurrent access
+        # Mutations since the last snapshot, one JSON object per line
+        self.wal_file = self.docs_dir / "index.wal"
+        self.wal = None
+        self._mutations_since_compact = 0
+        # Working state of an open bulk load: mutations collect here and are
+        # published (and compacted) once at the end, without WAL entries
+        self._pending = None
+
+        # Thread lock for the snapshot files and the WAL
         self._lock = threading.Lock()
+        # Serializes mutators; readers never lock, they use the published _state
+        self._writer_lock = threading.RLock()
+
+        # doc_id -> (updated_at, content), most recently used last
+        self._content_cache = OrderedDict()
+        self._content_cache_lock = threading.Lock()
 
-        self.load_index()
-        self.load_search_index()
+        # Threads for the search_documents content fallback, created on first use
+        self._search_pool = None
+
+        self._state = self._load_state()
+
+    @property
+    def index(self) -> Dict:
+        return self._state.index
+
+    @property
+    def search_index(self) -> Dict:
+        return self._state.search_index
 
     # ---------------------------
     # Index management
     # ---------------------------
-    def load_index(self):
+    def _load_state(self) -> _IndexState:
+        """Read both snapshots and replay the WAL on top of them"""
+        index = self.load_index()
+        state = _IndexState(index, self.load_search_index(index))
+        self.replay_wal(state)
+        return state
+
+    def load_index(self) -> Dict:
         if self.index_file.exists():
-            with open(self.index_file, "r", encoding="utf-8") as f:
-                self.index = json.load(f)
-        else:
-            self.index = {
-                "documents": {},
-                "metadata": {
-                    "created": datetime.now().isoformat(),
-                    "version": "2.0",
-                },
-            }
+            return orjson.loads(self.index_file.read_bytes())
+        return {
+            "documents": {},
+            "metadata": {
+                "created": datetime.now().isoformat(),
+                "version": "2.0",
+            },
+        }
 
-    def load_search_index(self):
-        if self.search_index_file.exists():
-            with open(self.search_index_file, "r", encoding="utf-8") as f:
-                self.search_index = json.load(f)
-        else:
-            self.search_index = {
+    def load_search_index(self, index: Dict) -> Dict:
+        if not self.search_index_file.exists():
+            return {
                 "by_type": {},
                 "by_category": {},
                 "by_tags": {},
                 "words": {},
             }
+        search_index = orjson.loads(self.search_index_file.read_bytes())
+
+        # The parser creates a new string for every id in every posting;
+        # point them all at the one doc_id object held by the index
+        canonical = {doc_id: doc_id for doc_id in index["documents"]}
+
+        # Structural postings are sets in memory (sorted lists on disk)
+        for key in ("by_type", "by_category", "by_tags"):
+            search_index[key] = {
+                name: {canonical.get(i, i) for i in ids} if isinstance(ids, list) else ids
+                for name, ids in search_index.get(key, {}).items()
+            }
+        # Trigram postings written by older versions; now rebuilt instead
+        search_index.pop("ngrams", None)
+        return search_index
 
     def save_index(self):
         with self._lock:
-            self.index["metadata"]["last_updated"] = datetime.now().isoformat()
-            with open(self.index_file, "w", encoding="utf-8") as f:
-                json.dump(self.index, f, indent=2, ensure_ascii=False)
+            self._write_snapshot(self.index_file, self.index, indent=True)
 
     def save_search_index(self):
         with self._lock:
-            with open(self.search_index_file, "w", encoding="utf-8") as f:
-                json.dump(self.search_index, f, indent=2, ensure_ascii=False)
+            self._write_snapshot(self.search_index_file, self.search_index)
+
+    def _write_snapshot(self, path: Path, data: Dict, indent: bool = False):
+        # Only the document index is meant to be read by people
+        option = orjson.OPT_INDENT_2 if indent else 0
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(orjson.dumps(data, default=_json_default, option=option))
+        os.replace(tmp, path)
 
     # ---------------------------
-    # Document operations
+    # Write-ahead log
+    # ---------------------------
+    def log_mutation(self, entry: Dict, timestamp: str):
+        """Append one mutation to the WAL, compacting every COMPACT_EVERY writes"""
+        entry["at"] = timestamp
+        line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+        with self._lock:
+            if self.wal is None or self.wal.closed:
+                self.wal = open(self.wal_file, "ab", buffering=0)
+            self.wal.write(line)
+            self._mutations_since_compact += 1
+            if self._mutations_since_compact < self.COMPACT_EVERY:
+                return
+        self.compact()
+
+    def replay_wal(self, state: _IndexState):
+        """Apply WAL entries written after the loaded snapshots"""
+        self._mutations_since_compact = 0
+        if not self.wal_file.exists():
+            return
+        with open(self.wal_file, "rb") as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # Torn final line from an interrupted write
+                    continue
+                self.apply_mutation(state, entry)
+                self._mutations_since_compact += 1
+
+    def apply_mutation(self, state: _IndexState, entry: Dict):
+        """Replay one WAL entry; entries are idempotent"""
+        doc_id = entry["id"]
+        old_doc = state.index["documents"].get(doc_id)
+        if old_doc is not None:
+            self.update_search_index(state, doc_id, old_doc, remove=True)
+        if entry["op"] == "put":
+            self.update_search_index(state, doc_id, entry["doc"])
+            self._put_document(state, doc_id, entry["doc"])
+        else:
+            self._put_document(state, doc_id, None)
+        # Replay runs before the trigram index is built, so it needs no update
+        state.index["metadata"]["last_updated"] = entry["at"]
+
+    def compact(self):
+        """Rewrite both snapshots and truncate the WAL"""
+        # Hold off writers so no mutation lands between snapshot and truncate
+        with self._writer_lock, self._lock:
+            state = self._state
+            self._write_snapshot(self.index_file, state.index, indent=True)
+            self._write_snapshot(self.search_index_file, state.search_index)
+            if self.wal is not None:
+                self.wal.close()
+            self.wal = open(self.wal_file, "wb", buffering=0)
+            self._mutations_since_compact = 0
+
+    def close(self):
+        """Compact and release the WAL and search threads (call on shutdown)"""
+        self.compact()
+        with self._lock:
+            self.wal.close()
+        if self._search_pool is not None:
+            self._search_pool.shutdown(wait=False)
+            self._search_pool = None
+
+    # ---------------------------
+    # Publishing
     # ---------------------------
-    def update_search_index(self, doc_id: str, doc_data: Dict, remove: bool = False):
-        if remove:
-            for type_docs in self.search_index["by_type"].values():
-                if isinstance(type_docs, list) and doc_id in type_docs:
-                    type_docs.remove(doc_id)
-
-            for cat_docs in self.search_index["by_category"].values():
-                if isinstance(cat_docs, list) and doc_id in cat_docs:
-                    cat_docs.remove(doc_id)
-
-            for tag_docs in self.search_index["by_tags"].values():
-                if isinstance(tag_docs, list) and doc_id in tag_docs:
-                    tag_docs.remove(doc_id)
+    def _working_state(self) -> _IndexState:
+        """State for a mutator to change: the open bulk load, or a copy of the published one"""
+        if self._pending is not None:
+            return self._pending
+        return self._state.copy()
+
+    def _commit(self, state: _IndexState, entry: Dict, timestamp: Optional[str] = None):
+        """Publish a mutated working state and log the mutation (under _writer_lock)"""
+        timestamp = timestamp or datetime.now().isoformat()
+        state.index["metadata"]["last_updated"] = timestamp
+        if self._pending is not None:
+            # Bulk load: published and compacted once when the batch closes
             return
+        self._state = state
+        self.log_mutation(entry, timestamp)
+
+    @contextmanager
+    def _bulk_load(self):
+        """Collect the mutations of a bulk load into one publish and one snapshot write"""
+        with self._writer_lock:
+            self._pending = state = self._state.copy()
+            try:
+                yield
+            finally:
+                self._pending = None
+                if state.index["documents"] != self._state.index["documents"]:
+                    self._state = state
+                    self.compact()
 
+    # ---------------------------
+    # Document operations
+    # ---------------------------
+    def update_search_index(self, state: _IndexState, doc_id: str, doc_data: Dict, remove: bool = False):
         doc_type = doc_data.get("type", "general")
         category = doc_data.get("category", "general")
         tags = doc_data.get("tags", [])
 
-        if doc_type not in self.search_index["by_type"]:
-            self.search_index["by_type"][doc_type] = []
-        if doc_id not in self.search_index["by_type"][doc_type]:
-            self.search_index["by_type"][doc_type].append(doc_id)
+        by_type = state.search_index["by_type"]
+        by_category = state.search_index["by_category"]
+        by_tags = state.search_index["by_tags"]
+        keys = [(by_type, doc_type), (by_category, category)]
+        keys.extend((by_tags, tag) for tag in tags)
+
+        # doc_data is the document's current record, so only its own
+        # postings need touching
+        for table, key in keys:
+            if remove:
+                posting = table.get(key)
+                if isinstance(posting, set) and doc_id in posting:
+                    state.posting(table, key, set).discard(doc_id)
+            else:
+                state.posting(table, key, set).add(doc_id)
+
+    def ensure_ngram_index(self) -> _IndexState:
+        """Published state with the trigram index built, building it if needed"""
+        state = self._state
+        if state.ngrams is not None:
+            return state
+        with self._writer_lock:
+            if self._state.ngrams is not None:
+                return self._state
+            ngrams = {}
+            for doc_id, doc_info in self._state.index["documents"].items():
+                title_lc, tags_lc = self._state.lowered.get(doc_id) or _lowered_fields(doc_info)
+                content_lc = self._read_content_lc(doc_id, doc_info) or ""
+                for gram in _doc_ngrams(title_lc, tags_lc, content_lc):
+                    ngrams.setdefault(gram, []).append(doc_id)
+            for posting in ngrams.values():
+                posting.sort()
+            state = self._state.copy()
+            state.ngrams = ngrams
+            self._state = state
+            return state
+
+    def update_ngram_index(self, state: _IndexState, doc_id: str, add: set = frozenset(), remove: set = frozenset()):
+        """Add/remove doc_id in the sorted trigram posting lists"""
+        ngrams = state.ngrams
+        if ngrams is None:
+            # Not built yet; ensure_ngram_index will see the current documents
+            return
+        for gram in remove:
+            posting = ngrams.get(gram)
+            if posting is None:
+                continue
+            i = bisect.bisect_left(posting, doc_id)
+            if i < len(posting) and posting[i] == doc_id:
+                posting = state.posting(ngrams, gram, list)
+                del posting[i]
+                if not posting:
+                    del ngrams[gram]
+        for gram in add:
+            posting = ngrams.get(gram, ())
+            i = bisect.bisect_left(posting, doc_id)
+            if i == len(posting) or posting[i] != doc_id:
+                state.posting(ngrams, gram, list).insert(i, doc_id)
+
+    def _put_document(self, state: _IndexState, doc_id: str, doc_data: Optional[Dict]):
+        """Set doc_id in the working state, or remove it if doc_data is None"""
+        documents = state.index["documents"]
+        old_doc = documents.get(doc_id)
+        old_key = (old_doc["created_at"], doc_id) if old_doc is not None else None
+        new_key = (doc_data["created_at"], doc_id) if doc_data is not None else None
+
+        if old_key is not None and old_key != new_key:
+            i = bisect.bisect_left(state.by_created, old_key)
+            if i < len(state.by_created) and state.by_created[i] == old_key:
+                del state.by_created[i]
+        if new_key is not None and new_key != old_key:
+            bisect.insort(state.by_created, new_key)
+
+        if doc_data is None:
+            documents.pop(doc_id, None)
+            state.lowered.pop(doc_id, None)
+        else:
+            documents[doc_id] = doc_data
+            state.lowered[doc_id] = _lowered_fields(doc_data)
 
-        if category not in self.search_index["by_category"]:
-            self.search_index["by_category"][category] = []
-        if doc_id not in self.search_index["by_category"][category]:
-            self.search_index["by_category"][category].append(doc_id)
+        for doc, delta in ((old_doc, -1), (doc_data, 1)):
+            if doc is not None:
+                self._adjust_count(state.type_counts, doc.get("type", "unknown"), delta)
+                self._adjust_count(state.category_counts, doc.get("category", "unknown"), delta)
 
-        for tag in tags:
-            if tag not in self.search_index["by_tags"]:
-                self.search_index["by_tags"][tag] = []
-            if doc_id not in self.search_index["by_tags"][tag]:
-                self.search_index["by_tags"][tag].append(doc_id)
+    @staticmethod
+    def _adjust_count(counts: Counter, key: str, delta: int):
+        counts[key] += delta
+        if counts[key] <= 0:
+            del counts[key]
 
     def add_document(
         self,
@@ -138,37 +454,125 @@ class EnhancedFileDocumentManager:
             "created_at": timestamp,
         }
 
-        with open(content_file, "w", encoding="utf-8") as f:
-            json.dump(content_data, f, indent=2, ensure_ascii=False)
-
-        self.index["documents"][doc_id] = document_data
-        self.update_search_index(doc_id, document_data)
+        # Machine-read only, so written compact
+        content_file.write_bytes(orjson.dumps(content_data))
+        self._write_content_lc(document_data, content)
 
-        self.save_index()
-        self.save_search_index()
+        with self._writer_lock:
+            state = self._working_state()
+            self.update_search_index(state, doc_id, document_data)
+            if state.ngrams is not None:
+                self.update_ngram_index(state, doc_id, add=_doc_ngrams(title, document_data["tags"], content))
+            self._put_document(state, doc_id, document_data)
+            self._commit(state, {"op": "put", "id": doc_id, "doc": document_data}, timestamp)
 
         print(f"✅ Document added: {title} (ID: {doc_id})")
         return doc_id
 
     def get_document(self, doc_id: str) -> Optional[Dict]:
-        if doc_id not in self.index["documents"]:
+        doc_info = self.index["documents"].get(doc_id)
+        if doc_info is None:
             return None
 
-        doc_info = self.index["documents"][doc_id]
-        content_file = self.content_dir / doc_info["file_path"]
+        content = self._read_content(doc_id, doc_info)
+        if content is None:
+            return None
+
+        return {**doc_info, "content": content}
+
+    def _read_content(self, doc_id: str, doc_info: Dict) -> Optional[str]:
+        # Entries are tagged with the record version they were read for, so
+        # content cached for an older version is never served for a newer one
+        version = doc_info.get("updated_at")
+        with self._content_cache_lock:
+            entry = self._content_cache.get(doc_id)
+            if entry is not None and entry[0] == version:
+                self._content_cache.move_to_end(doc_id)
+                return entry[1]
 
+        content_file = self.content_dir / doc_info["file_path"]
         if not content_file.exists():
             return None
+        content = orjson.loads(content_file.read_bytes())["content"]
+
+        with self._content_cache_lock:
+            # A writer may have replaced the document while the file was read
+            current = self._state.index["documents"].get(doc_id)
+            if current is None or current.get("updated_at") != version:
+                return content
+            self._content_cache[doc_id] = (version, content)
+            self._content_cache.move_to_end(doc_id)
+            if len(self._content_cache) > self.CONTENT_CACHE_SIZE:
+                self._content_cache.popitem(last=False)
+        return content
+
+    def _content_lc_file(self, doc_info: Dict) -> Path:
+        """Lowercased plain-text copy of the content, scanned by search_documents"""
+        return self.content_dir / (Path(doc_info["file_path"]).stem + ".lc.txt")
+
+    def _read_content_lc(self, doc_id: str, doc_info: Dict) -> Optional[str]:
+        """Lowercased content, from the .lc.txt copy when it exists"""
+        try:
+            return self._content_lc_file(doc_info).read_bytes().decode("utf-8")
+        except FileNotFoundError:
+            pass
+        content = self._read_content(doc_id, doc_info)
+        if content is None:
+            return None
+        self._write_content_lc(doc_info, content)
+        return content.lower()
+
+    def _write_content_lc(self, doc_info: Dict, content: str):
+        self._content_lc_file(doc_info).write_bytes(content.lower().encode("utf-8"))
+
+    def _content_contains(self, doc_id: str, doc_info: Dict, query_lower: str, query_bytes: bytes) -> bool:
+        """Case-insensitive substring test against the content, without parsing JSON"""
+        try:
+            with open(self._content_lc_file(doc_info), "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return mm.find(query_bytes) != -1
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # Empty content cannot be mapped
+            return False
 
-        with open(content_file, "r", encoding="utf-8") as f:
-            content_data = json.load(f)
-
-        return {**doc_info, "content": content_data["content"]}
+        # Documents written before the .lc.txt copies existed
+        content = self._read_content(doc_id, doc_info)
+        if content is None:
+            return False
+        self._write_content_lc(doc_info, content)
+        return query_lower in content.lower()
 
-    def list_documents(self, limit: int = 100) -> List[Dict]:
-        docs = list(self.index["documents"].values())
-        docs.sort(key=lambda x: x["created_at"], reverse=True)
-        return docs[:limit]
+    def _invalidate_content(self, doc_id: Optional[str] = None):
+        with self._content_cache_lock:
+            if doc_id is None:
+                self._content_cache.clear()
+            else:
+                self._content_cache.pop(doc_id, None)
+
+    def list_documents(self, limit: int = 100, offset: int = 0) -> List[Dict]:
+        state = self._state
+        # by_created is kept sorted, so the newest page is a slice off the end
+        end = len(state.by_created) - offset
+        if end <= 0 or limit <= 0:
+            return []
+        keys = state.by_created[max(end - limit, 0):end]
+        documents = state.index["documents"]
+        return [documents[doc_id] for _, doc_id in reversed(keys)]
+
+    def count_documents(self) -> int:
+        return len(self.index["documents"])
+
+    def _get_search_pool(self) -> ThreadPoolExecutor:
+        if self._search_pool is None:
+            with self._writer_lock:
+                if self._search_pool is None:
+                    self._search_pool = ThreadPoolExecutor(
+                        max_workers=min(32, (os.cpu_count() or 1) * 4),
+                        thread_name_prefix="doc-search",
+                    )
+        return self._search_pool
 
     def search_documents(
         self,
@@ -178,114 +582,175 @@ class EnhancedFileDocumentManager:
         tags: List[str] = None,
         limit: int = 50,
     ) -> List[Dict]:
-        candidate_ids = set(self.index["documents"].keys())
+        query_lower = query.lower() if query else ""
+        query_grams = _ngrams(query_lower)
+
+        # One consistent snapshot for the whole query; with query trigrams it
+        # must be the state ensure_ngram_index checked, since a concurrent
+        # reload could publish one without the index
+        state = self.ensure_ngram_index() if query_grams else self._state
+        documents = state.index["documents"]
+        search_index = state.search_index
+        candidate_ids = set(documents.keys())
 
-        if doc_type and doc_type in self.search_index["by_type"]:
-            candidate_ids &= set(self.search_index["by_type"][doc_type])
+        if doc_type and doc_type in search_index["by_type"]:
+            candidate_ids &= set(search_index["by_type"][doc_type])
 
-        if category and category in self.search_index["by_category"]:
-            candidate_ids &= set(self.search_index["by_category"][category])
+        if category and category in search_index["by_category"]:
+            candidate_ids &= set(search_index["by_category"][category])
 
         if tags:
             tag_ids = set()
             for tag in tags:
-                if tag in self.search_index["by_tags"]:
-                    tag_ids.update(self.search_index["by_tags"][tag])
+                if tag in search_index["by_tags"]:
+                    tag_ids.update(search_index["by_tags"][tag])
             candidate_ids &= tag_ids
 
         if query:
-            query_lower = query.lower()
+            # Narrow to documents containing every trigram of the query,
+            # intersecting the shortest posting lists first
+            if query_grams:
+                ngrams = state.ngrams
+                postings = sorted((ngrams.get(g, ()) for g in query_grams), key=len)
+                for posting in postings:
+                    candidate_ids.intersection_update(posting)
+                    if not candidate_ids:
+                        break
+
             filtered_ids = set()
+            content_ids = []
+            lowered = state.lowered
 
             for doc_id in candidate_ids:
-                doc_info = self.index["documents"][doc_id]
-                if query_lower in doc_info["title"].lower():
+                title_lc, tags_lc = lowered.get(doc_id) or _lowered_fields(documents[doc_id])
+                if query_lower in title_lc:
                     filtered_ids.add(doc_id)
                     continue
-                if any(query_lower in tag.lower() for tag in doc_info["tags"]):
+                if any(query_lower in tag for tag in tags_lc):
                     filtered_ids.add(doc_id)
                     continue
+                content_ids.append(doc_id)
+
+            # Single literal pattern: memmem over the mapped file is already a
+            # linear scan, so the query is only encoded once rather than compiled
+            query_bytes = query_lower.encode("utf-8")
+
+            def content_matches(doc_id):
                 try:
-                    doc = self.get_document(doc_id)
-                    if doc and query_lower in doc["content"].lower():
-                        filtered_ids.add(doc_id)
+                    return self._content_contains(doc_id, documents[doc_id], query_lower, query_bytes)
                 except:
-                    continue
+                    return False
+
+            # Content checks read files, so run them in parallel
+            if len(content_ids) > 1:
+                hits = self._get_search_pool().map(content_matches, content_ids)
+            else:
+                hits = map(content_matches, content_ids)
+            filtered_ids.update(doc_id for doc_id, hit in zip(content_ids, hits) if hit)
             candidate_ids = filtered_ids
 
+        # Newest `limit` candidates, already in result order
+        newest = heapq.nlargest(
+            limit,
+            (doc_id for doc_id in candidate_ids if doc_id in documents),
+            key=lambda doc_id: documents[doc_id]["created_at"],
+        )
         results = []
-        for doc_id in list(candidate_ids)[:limit]:
-            if doc_id in self.index["documents"]:
-                doc = self.get_document(doc_id)
-                if doc:
-                    results.append(doc)
+        for doc_id in newest:
+            doc_info = documents[doc_id]
+            content = self._read_content(doc_id, doc_info)
+            if content is not None:
+                results.append({**doc_info, "content": content})
 
-        results.sort(key=lambda x: x["created_at"], reverse=True)
         return results
 
     def remove_document(self, doc_id: str) -> bool:
-        if doc_id not in self.index["documents"]:
+        with self._writer_lock:
+            return self._remove_document(doc_id)
+
+    def _remove_document(self, doc_id: str) -> bool:
+        state = self._working_state()
+        doc_info = state.index["documents"].get(doc_id)
+        if doc_info is None:
             print(f"❌ Document {doc_id} not found")
             return False
 
-        doc_info = self.index["documents"][doc_id]
+        if state.ngrams is not None:
+            content = self._read_content(doc_id, doc_info) or ""
+            self.update_ngram_index(
+                state, doc_id, remove=_doc_ngrams(doc_info["title"], doc_info["tags"], content)
+            )
         content_file = self.content_dir / doc_info["file_path"]
         if content_file.exists():
             content_file.unlink()
+        self._content_lc_file(doc_info).unlink(missing_ok=True)
+        self._invalidate_content(doc_id)
 
-        self.update_search_index(doc_id, doc_info, remove=True)
-        removed_doc = self.index["documents"].pop(doc_id)
+        self.update_search_index(state, doc_id, doc_info, remove=True)
+        self._put_document(state, doc_id, None)
+        self._commit(state, {"op": "remove", "id": doc_id})
 
-        self.save_index()
-        self.save_search_index()
-
-        print(f"✅ Document removed: {removed_doc['title']}")
+        print(f"✅ Document removed: {doc_info['title']}")
         return True
 
     def update_document(self, doc_id: str, **kwargs) -> bool:
-        if doc_id not in self.index["documents"]:
+        with self._writer_lock:
+            return self._update_document(doc_id, **kwargs)
+
+    def _update_document(self, doc_id: str, **kwargs) -> bool:
+        state = self._working_state()
+        old_doc_info = state.index["documents"].get(doc_id)
+        if old_doc_info is None:
             return False
 
-        doc_info = self.index["documents"][doc_id]
+        # One timestamp for the content file, the record and the WAL entry
+        timestamp = datetime.now().isoformat()
+
+        reindex_text = state.ngrams is not None and any(
+            key in kwargs for key in ["title", "tags", "content"]
+        )
+        if reindex_text:
+            # From the working state: during a bulk load doc_id may not be published yet
+            old_content = self._read_content(doc_id, old_doc_info)
+            old_grams = _doc_ngrams(old_doc_info["title"], old_doc_info["tags"], old_content or "")
 
         if "content" in kwargs:
-            content_file = self.content_dir / doc_info["file_path"]
+            content_file = self.content_dir / old_doc_info["file_path"]
             if content_file.exists():
-                with open(content_file, "r", encoding="utf-8") as f:
-                    content_data = json.load(f)
+                content_data = orjson.loads(content_file.read_bytes())
                 content_data["content"] = kwargs["content"]
-                content_data["updated_at"] = datetime.now().isoformat()
-                with open(content_file, "w", encoding="utf-8") as f:
-                    json.dump(content_data, f, indent=2, ensure_ascii=False)
+                content_data["updated_at"] = timestamp
+                content_file.write_bytes(orjson.dumps(content_data))
+                self._write_content_lc(old_doc_info, kwargs["content"])
+            self._invalidate_content(doc_id)
 
-        old_doc_info = doc_info.copy()
+        doc_info = old_doc_info.copy()
         for key, value in kwargs.items():
             if key != "content" and key in doc_info:
                 doc_info[key] = value
 
-        doc_info["updated_at"] = datetime.now().isoformat()
+        doc_info["updated_at"] = timestamp
 
         if any(key in kwargs for key in ["type", "category", "tags"]):
-            self.update_search_index(doc_id, old_doc_info, remove=True)
-            self.update_search_index(doc_id, doc_info)
+            self.update_search_index(state, doc_id, old_doc_info, remove=True)
+            self.update_search_index(state, doc_id, doc_info)
+
+        if reindex_text:
+            new_content = kwargs["content"] if "content" in kwargs and old_content is not None else old_content or ""
+            new_grams = _doc_ngrams(doc_info["title"], doc_info["tags"], new_content)
+            self.update_ngram_index(state, doc_id, add=new_grams - old_grams, remove=old_grams - new_grams)
 
-        self.save_index()
-        self.save_search_index()
+        self._put_document(state, doc_id, doc_info)
+        self._commit(state, {"op": "put", "id": doc_id, "doc": doc_info}, timestamp)
         return True
 
     def get_stats(self) -> Dict:
-        total = len(self.index["documents"])
-        types = {}
-        categories = {}
-        for doc in self.index["documents"].values():
-            doc_type = doc.get("type", "unknown")
-            types[doc_type] = types.get(doc_type, 0) + 1
-            category = doc.get("category", "unknown")
-            categories[category] = categories.get(category, 0) + 1
+        # Counts are maintained by _put_document
+        state = self._state
         return {
-            "total_documents": total,
-            "document_types": types,
-            "categories": categories,
+            "total_documents": len(state.index["documents"]),
+            "document_types": dict(state.type_counts),
+            "categories": dict(state.category_counts),
         }
 
     # ---------------------------
@@ -295,15 +760,20 @@ class EnhancedFileDocumentManager:
         """Load external JSON documents from projects and regulations folders"""
         base = Path(base_dir)
 
+        # Publish the whole batch once, with one snapshot write instead of per document
+        with self._bulk_load():
+            self._load_external_documents()
+
+    def _load_external_documents(self):
         # Projects
         if self.projects_dir.exists():
-            for file in self.projects_dir.glob("*.json"):
+            for file in _json_files(self.projects_dir):
                 try:
-                    with open(file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+                    raw = file.read_bytes()
+                    orjson.loads(raw)  # validate only; the file text is stored as-is
                     self.add_document(
                         title=file.stem,
-                        content=json.dumps(data, indent=2, ensure_ascii=False),
+                        content=raw.decode("utf-8"),
                         doc_type="project",
                         category="projects",
                     )
@@ -313,13 +783,13 @@ class EnhancedFileDocumentManager:
 
         # Regulations
         if self.regulations_dir.exists():
-            for file in self.regulations_dir.glob("*.json"):
+            for file in _json_files(self.regulations_dir):
                 try:
-                    with open(file, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+                    raw = file.read_bytes()
+                    orjson.loads(raw)  # validate only; the file text is stored as-is
                     self.add_document(
                         title=file.stem,
-                        content=json.dumps(data, indent=2, ensure_ascii=False),
+                        content=raw.decode("utf-8"),
                         doc_type="regulation",
                         category="regulations",
                     )
@@ -329,10 +799,20 @@ class EnhancedFileDocumentManager:
 
     def load_all_documents(self):
         """FIXED: Load all documents WITH content, not just metadata"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aload_all_documents())
+
+        # Called from inside an event loop: read the files one by one
         all_docs = []
         
         for doc_id in self.index["documents"].keys():
-            doc = self.get_document(doc_id)  # This loads content from file
+            try:
+                doc = self.get_document(doc_id)  # This loads content from file
+            except (ValueError, KeyError, TypeError):
+                # Corrupt content file; skip it like a missing one
+                doc = None
             if doc:
                 all_docs.append(doc)
             else:
@@ -340,7 +820,54 @@ class EnhancedFileDocumentManager:
         
         return all_docs
 
+    async def aload_all_documents(self) -> List[Dict]:
+        """Load all documents with content, reading the files concurrently"""
+        documents = self.index["documents"]
+        semaphore = asyncio.Semaphore(self.LOAD_CONCURRENCY)
+
+        async def read_one(doc_info):
+            content_file = self.content_dir / doc_info["file_path"]
+            async with semaphore:
+                try:
+                    async with aiofiles.open(content_file, "rb") as f:
+                        raw = await f.read()
+                except FileNotFoundError:
+                    return None
+            try:
+                content = orjson.loads(raw)["content"]
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                # Corrupt content file; skip it (with the warning below)
+                # rather than failing the whole load
+                return None
+            return {**doc_info, "content": content}
+
+        docs = await asyncio.gather(*(read_one(doc_info) for doc_info in documents.values()))
+
+        all_docs = []
+        for doc_id, doc in zip(documents, docs):
+            if doc:
+                all_docs.append(doc)
+            else:
+                print(f"⚠️ Warning: Could not load content for document {doc_id}")
+        return all_docs
+
     def reload_documents(self):
-        self.load_index()
-        self.load_search_index()
-        print("🔄 Document manager reloaded documents from disk")
\ No newline at end of file
+        with self._writer_lock:
+            self._state = self._load_state()
+        self._invalidate_content()
+        print("🔄 Document manager reloaded documents from disk")
+
+
+# Process-wide document manager shared by the API and the AI engine
+_document_manager = None
+_document_manager_lock = threading.Lock()
+
+
+def get_document_manager() -> EnhancedFileDocumentManager:
+    """Return the shared document manager, creating it on first use"""
+    global _document_manager
+    if _document_manager is None:
+        with _document_manager_lock:
+            if _document_manager is None:
+                _document_manager = EnhancedFileDocumentManager()
+    return _document_manager
\ No newline at end of file
@@ -0,0 +1,20 @@
+import pytest
+
+from src.data_processor import DataProcessor
+
+
+def test_sections_are_read_only(tmp_path):
+    processor = DataProcessor(data_dir=tmp_path, verbose=False)
+    all_data = processor.load_all_data()
+    with pytest.raises(TypeError):
+        all_data['company_profile']['basic_info']['name'] = "Changed"
+    with pytest.raises(AttributeError):
+        all_data['projects'][0]['technologies'].append("Changed")
+    with pytest.raises(AttributeError):
+        all_data['projects'].clear()
+
+    fresh = DataProcessor(data_dir=tmp_path, verbose=False).load_all_data()
+    for data in (fresh, processor.load_all_data()):
+        assert data['company_profile']['basic_info']['name'] == "RailAdvice AS"
+        assert data['projects']
+        assert "Changed" not in data['projects'][0]['technologies']